@@ -12,9 +12,20 @@ from models import Base
 
 
 # Async engine for FastAPI (SQLite compatible)
+_engine_kwargs = {"echo": settings.DEBUG}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    # Keep a steady pool of warm connections (PostgreSQL): asyncpg caches
+    # prepared statements per connection, so reusing connections lets
+    # repeated queries skip the parse/plan step entirely
+    _engine_kwargs.update(
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=1800,
+    )
+
 async_engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    **_engine_kwargs,
 )
 
 # Async session factory
@@ -3,15 +3,64 @@ Email Service
 Send verification emails, OTP codes, and alerts
 """
 
+import asyncio
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from string import Template
 from typing import Optional
 from datetime import datetime
 
 from config import settings
 
 
+# Shared SMTP client, reused across sends to avoid a full
+# connect/STARTTLS/login handshake per email
+_smtp_client: Optional[aiosmtplib.SMTP] = None
+_smtp_lock = asyncio.Lock()
+
+
+async def _get_smtp_client() -> aiosmtplib.SMTP:
+    """Get the shared SMTP client, (re)connecting if needed"""
+    global _smtp_client
+
+    if _smtp_client is None:
+        _smtp_client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            start_tls=True,
+        )
+
+    if not _smtp_client.is_connected:
+        await _smtp_client.connect()
+
+    return _smtp_client
+
+
+def _build_message(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> MIMEMultipart:
+    """Build a multipart email message"""
+    message = MIMEMultipart("alternative")
+    message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
+    message["To"] = to_email
+    message["Subject"] = subject
+
+    # Attach text version (fallback)
+    if text_content:
+        message.attach(MIMEText(text_content, "plain"))
+
+    # Attach HTML version
+    message.attach(MIMEText(html_content, "html"))
+
+    return message
+
+
 async def send_email(
     to_email: str,
     subject: str,
@@ -22,37 +71,67 @@ async def send_email(
     Send an email using SMTP
     Returns: {"success": bool, "error": str | None}
     """
+    global _smtp_client
+
+    message = _build_message(to_email, subject, html_content, text_content)
+
     try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
-        message["To"] = to_email
-        message["Subject"] = subject
-        
-        # Attach text version (fallback)
-        if text_content:
-            message.attach(MIMEText(text_content, "plain"))
-        
-        # Attach HTML version
-        message.attach(MIMEText(html_content, "html"))
-        
-        # Send email
-        await aiosmtplib.send(
-            message,
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            username=settings.SMTP_USER,
-            password=settings.SMTP_PASSWORD,
-            start_tls=True,
-        )
-        
+        async with _smtp_lock:
+            try:
+                client = await _get_smtp_client()
+                await client.send_message(message)
+            except (aiosmtplib.SMTPException, ConnectionError):
+                # Stale or dropped connection - reconnect and retry once
+                _smtp_client = None
+                client = await _get_smtp_client()
+                await client.send_message(message)
+
         return {"success": True, "error": None}
-        
+
     except Exception as e:
         print(f"❌ Email send error: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+async def send_bulk_emails(emails: list) -> list:
+    """
+    Send a batch of emails over a single SMTP connection.
+
+    Each entry is a dict with keys: to_email, subject, html_content and
+    optional text_content. The connect/STARTTLS/login handshake is paid once
+    for the whole batch; SMTP serialises messages per connection, so sends
+    are pipelined back-to-back rather than raced.
+    Returns one {"success", "error"} dict per entry, in order.
+    """
+    global _smtp_client
+
+    messages = [
+        _build_message(
+            e["to_email"], e["subject"], e["html_content"], e.get("text_content")
+        )
+        for e in emails
+    ]
+
+    results = []
+    async with _smtp_lock:
+        for message in messages:
+            try:
+                try:
+                    client = await _get_smtp_client()
+                    await client.send_message(message)
+                except (aiosmtplib.SMTPException, ConnectionError):
+                    # Stale or dropped connection - reconnect and retry once
+                    _smtp_client = None
+                    client = await _get_smtp_client()
+                    await client.send_message(message)
+                results.append({"success": True, "error": None})
+            except Exception as e:
+                print(f"❌ Email send error: {str(e)}")
+                results.append({"success": False, "error": str(e)})
+
+    return results
+
+
 def get_email_styles() -> str:
     """Get shared CSS styles for emails"""
     return """
@@ -127,12 +206,14 @@ def get_email_styles() -> str:
     """
 
 
-async def send_verification_email(to_email: str, verification_link: str) -> dict:
-    """Send email verification link"""
-    
-    subject = "Verify Your UptimeAI Account"
-    
-    html_content = f"""
+# ====================
+# Email Templates
+# ====================
+# Templates are rendered once at import time (styles, expiry windows and the
+# copyright year baked in); only per-send fields remain as $placeholders.
+# string.Template is used because the CSS braces would collide with str.format.
+
+_VERIFICATION_HTML = Template(f"""
     <!DOCTYPE html>
     <html>
     <head>{get_email_styles()}</head>
@@ -144,21 +225,21 @@ async def send_verification_email(to_email: str, verification_link: str) -> dict
             <div class="content">
                 <h2>Welcome to UptimeAI!</h2>
                 <p>Thank you for signing up. Please verify your email address to activate your account.</p>
-                
+
                 <p style="text-align: center;">
-                    <a href="{verification_link}" class="button">Verify Email Address</a>
+                    <a href="$verification_link" class="button">Verify Email Address</a>
                 </p>
-                
+
                 <p style="color: #9ca3af; font-size: 14px;">
                     Or copy and paste this link into your browser:
                     <br>
-                    <code style="color: #3b82f6; word-break: break-all;">{verification_link}</code>
+                    <code style="color: #3b82f6; word-break: break-all;">$verification_link</code>
                 </p>
-                
+
                 <div class="warning">
                     <strong>⏱️ This link expires in {settings.EMAIL_VERIFICATION_EXPIRE_HOURS} hours.</strong>
                 </div>
-                
+
                 <p style="color: #6b7280; font-size: 12px;">
                     If you didn't create an account, you can safely ignore this email.
                 </p>
@@ -169,34 +250,32 @@ async def send_verification_email(to_email: str, verification_link: str) -> dict
         </div>
     </body>
     </html>
-    """
-    
-    text_content = f"""
+    """)
+
+_VERIFICATION_TEXT = Template(f"""
     Welcome to UptimeAI!
-    
+
     Please verify your email by clicking this link:
-    {verification_link}
-    
+    $verification_link
+
     This link expires in {settings.EMAIL_VERIFICATION_EXPIRE_HOURS} hours.
-    
+
     If you didn't create an account, ignore this email.
-    """
-    
+    """)
+
+
+async def send_verification_email(to_email: str, verification_link: str) -> dict:
+    """Send email verification link"""
+
+    subject = "Verify Your UptimeAI Account"
+
+    html_content = _VERIFICATION_HTML.substitute(verification_link=verification_link)
+    text_content = _VERIFICATION_TEXT.substitute(verification_link=verification_link)
+
     return await send_email(to_email, subject, html_content, text_content)
 
 
-async def send_otp_email(to_email: str, otp_code: str, purpose: str = "login") -> dict:
-    """Send OTP code for MFA verification"""
-    
-    purpose_text = {
-        "login": "complete your login",
-        "setup_mfa": "set up two-factor authentication",
-        "reset_password": "reset your password"
-    }.get(purpose, "verify your identity")
-    
-    subject = f"Your UptimeAI Verification Code: {otp_code}"
-    
-    html_content = f"""
+_OTP_HTML = Template(f"""
     <!DOCTYPE html>
     <html>
     <head>{get_email_styles()}</head>
@@ -206,16 +285,16 @@ async def send_otp_email(to_email: str, otp_code: str, purpose: str = "login") -
                 <h1>🔐 Verification Code</h1>
             </div>
             <div class="content">
-                <p>Use this code to {purpose_text}:</p>
-                
+                <p>Use this code to $purpose_text:</p>
+
                 <div class="otp-box">
-                    <div class="otp-code">{otp_code}</div>
+                    <div class="otp-code">$otp_code</div>
                 </div>
-                
+
                 <div class="warning">
                     <strong>⏱️ This code expires in {settings.OTP_VALID_SECONDS // 60} minutes.</strong>
                 </div>
-                
+
                 <p style="color: #9ca3af; font-size: 14px;">
                     If you didn't request this code, please secure your account immediately.
                 </p>
@@ -226,29 +305,39 @@ async def send_otp_email(to_email: str, otp_code: str, purpose: str = "login") -
         </div>
     </body>
     </html>
-    """
-    
-    text_content = f"""
+    """)
+
+_OTP_TEXT = Template(f"""
     Your UptimeAI Verification Code
-    
-    Use this code to {purpose_text}:
-    
-    {otp_code}
-    
+
+    Use this code to $purpose_text:
+
+    $otp_code
+
     This code expires in {settings.OTP_VALID_SECONDS // 60} minutes.
-    
+
     If you didn't request this code, secure your account immediately.
-    """
-    
+    """)
+
+
+async def send_otp_email(to_email: str, otp_code: str, purpose: str = "login") -> dict:
+    """Send OTP code for MFA verification"""
+
+    purpose_text = {
+        "login": "complete your login",
+        "setup_mfa": "set up two-factor authentication",
+        "reset_password": "reset your password"
+    }.get(purpose, "verify your identity")
+
+    subject = f"Your UptimeAI Verification Code: {otp_code}"
+
+    html_content = _OTP_HTML.substitute(purpose_text=purpose_text, otp_code=otp_code)
+    text_content = _OTP_TEXT.substitute(purpose_text=purpose_text, otp_code=otp_code)
+
     return await send_email(to_email, subject, html_content, text_content)
 
 
-async def send_password_reset_email(to_email: str, reset_link: str) -> dict:
-    """Send password reset link"""
-    
-    subject = "Reset Your UptimeAI Password"
-    
-    html_content = f"""
+_PASSWORD_RESET_HTML = Template(f"""
     <!DOCTYPE html>
     <html>
     <head>{get_email_styles()}</head>
@@ -260,15 +349,15 @@ async def send_password_reset_email(to_email: str, reset_link: str) -> dict:
             <div class="content">
                 <h2>Reset Your Password</h2>
                 <p>We received a request to reset your password. Click the button below to create a new password.</p>
-                
+
                 <p style="text-align: center;">
-                    <a href="{reset_link}" class="button">Reset Password</a>
+                    <a href="$reset_link" class="button">Reset Password</a>
                 </p>
-                
+
                 <div class="warning">
                     <strong>⏱️ This link expires in 1 hour.</strong>
                 </div>
-                
+
                 <p style="color: #6b7280; font-size: 12px;">
                     If you didn't request a password reset, you can safely ignore this email.
                     Your password will remain unchanged.
@@ -280,17 +369,21 @@ async def send_password_reset_email(to_email: str, reset_link: str) -> dict:
         </div>
     </body>
     </html>
-    """
-    
+    """)
+
+
+async def send_password_reset_email(to_email: str, reset_link: str) -> dict:
+    """Send password reset link"""
+
+    subject = "Reset Your UptimeAI Password"
+
+    html_content = _PASSWORD_RESET_HTML.substitute(reset_link=reset_link)
+
     return await send_email(to_email, subject, html_content)
 
 
-async def send_mfa_enabled_email(to_email: str) -> dict:
-    """Notify user that MFA has been enabled"""
-    
-    subject = "Two-Factor Authentication Enabled - UptimeAI"
-    
-    html_content = f"""
+# Fully static - no per-send fields to substitute
+_MFA_ENABLED_HTML = f"""
     <!DOCTYPE html>
     <html>
     <head>{get_email_styles()}</head>
@@ -302,15 +395,15 @@ async def send_mfa_enabled_email(to_email: str) -> dict:
             <div class="content">
                 <h2>Two-Factor Authentication is Now Active</h2>
                 <p>Your account security has been enhanced! You'll now need to enter a verification code each time you log in.</p>
-                
+
                 <p style="color: #10b981;">
                     <strong>🔒 Your account is now more secure.</strong>
                 </p>
-                
+
                 <p style="color: #9ca3af; font-size: 14px;">
                     Make sure to keep your backup codes in a safe place in case you lose access to your authenticator app.
                 </p>
-                
+
                 <div class="warning">
                     <strong>⚠️ If you didn't enable MFA, contact support immediately.</strong>
                 </div>
@@ -322,5 +415,11 @@ async def send_mfa_enabled_email(to_email: str) -> dict:
     </body>
     </html>
     """
-    
-    return await send_email(to_email, subject, html_content)
+
+
+async def send_mfa_enabled_email(to_email: str) -> dict:
+    """Notify user that MFA has been enabled"""
+
+    subject = "Two-Factor Authentication Enabled - UptimeAI"
+
+    return await send_email(to_email, subject, _MFA_ENABLED_HTML)
@@ -0,0 +1,40 @@
+"""
+FastScaler - minimal standardizer for the training scripts
+
+Drop-in replacement for sklearn's StandardScaler on the (x - mean) / std
+path: one statistics pass, in-place fit_transform, no validation or
+copy machinery. It exposes the same mean_/scale_ attributes and
+transform() API, so ml_model.load_model unpickles and uses it exactly
+like the sklearn object.
+
+Lives in its own module (not in a notebook script) so pickles reference
+an importable qualified name instead of __main__.
+"""
+
+import numpy as np
+
+
+class FastScaler:
+    """Standardize features to zero mean / unit variance"""
+
+    def fit(self, X):
+        # Accumulate moments in float64 for stability, store in X's
+        # dtype so transform arithmetic stays in one precision
+        self.mean_ = X.mean(axis=0, dtype=np.float64).astype(X.dtype)
+        self.scale_ = X.std(axis=0, dtype=np.float64).astype(X.dtype)
+        # Constant columns pass through unchanged instead of dividing by 0
+        self.scale_[self.scale_ == 0] = 1
+        return self
+
+    def fit_transform(self, X):
+        """Fit and normalize X in place - one cache sweep, no allocation"""
+        self.fit(X)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+    def transform(self, X):
+        """Normalize X into a fresh array (callers may alias their input)"""
+        out = np.subtract(X, self.mean_, dtype=self.mean_.dtype)
+        out /= self.scale_
+        return out
@@ -9,10 +9,32 @@ Final Year Project: AI-Based Machine Health Prediction and Real-Time Alert Syste
 import os
 import joblib
 import json
+import logging
+import threading
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    # No-op decorator so the scalar kernels below run as plain Python
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+        return wrap
+
 
 # Model paths
 ML_DIR = os.path.join(os.path.dirname(__file__), "ml")
@@ -21,50 +43,176 @@ REGRESSOR_PATH = os.path.join(ML_DIR, "rul_regressor.pkl")
 SCALER_PATH = os.path.join(ML_DIR, "feature_scaler.pkl")
 METADATA_PATH = os.path.join(ML_DIR, "model_metadata.json")
 
+# Compiled inference artifacts (preferred over the pickles when present)
+ONNX_CLASSIFIER_PATH = os.path.join(ML_DIR, "health_classifier.onnx")
+ONNX_REGRESSOR_PATH = os.path.join(ML_DIR, "rul_regressor.onnx")
+
+try:
+    import onnxruntime
+    _HAS_ONNXRUNTIME = True
+except ImportError:
+    _HAS_ONNXRUNTIME = False
+
+
+class _OnnxClassifier:
+    """Adapter exposing the sklearn classifier API over an onnxruntime session"""
+
+    def __init__(self, path: str):
+        self._session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def _run(self, X):
+        return self._session.run(None, {self._input_name: np.asarray(X, dtype=np.float32)})
+
+    def predict(self, X):
+        return self._run(X)[0]
+
+    def predict_proba(self, X):
+        # Requires export with zipmap disabled (see export_onnx_models)
+        return self._run(X)[1]
+
+
+class _OnnxRegressor:
+    """Adapter exposing the sklearn regressor API over an onnxruntime session"""
+
+    def __init__(self, path: str):
+        self._session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def predict(self, X):
+        result = self._session.run(None, {self._input_name: np.asarray(X, dtype=np.float32)})
+        return result[0].ravel()
+
+
+def export_onnx_models() -> bool:
+    """
+    Convert the fitted sklearn pickles to ONNX artifacts (offline build step).
+    The compiled graphs walk all trees in one native routine instead of
+    dispatching per estimator through Python.
+    """
+    try:
+        from skl2onnx import to_onnx
+    except ImportError:
+        print("[WARNING] skl2onnx not installed - cannot export ONNX models")
+        return False
+
+    sample = np.zeros((1, 5), dtype=np.float32)
+
+    classifier = joblib.load(CLASSIFIER_PATH)
+    onx = to_onnx(classifier, sample, options={id(classifier): {"zipmap": False}})
+    with open(ONNX_CLASSIFIER_PATH, "wb") as f:
+        f.write(onx.SerializeToString())
+
+    regressor = joblib.load(REGRESSOR_PATH)
+    onx = to_onnx(regressor, sample)
+    with open(ONNX_REGRESSOR_PATH, "wb") as f:
+        f.write(onx.SerializeToString())
+
+    print("[OK] ONNX models exported")
+    return True
+
 # Global models
 _classifier = None
 _regressor = None
 _scaler = None
 _metadata = None
 
+# Metadata-derived constants, resolved once in load_models instead of
+# re-reading the metadata dict on every prediction
+_feature_names: list = []
+_has_cycle = False
+_initial_rul = 150
+
+# Per-thread scratch buffers for single-row prediction
+_tls = threading.local()
+
+# Two workers so the classifier and regressor traverse their trees in
+# parallel; sklearn releases the GIL inside the Cython traversal
+_inference_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="inference")
+
+# ISO timestamp cached at second granularity: responses are timestamped per
+# request, and strftime/isoformat dominates when predictions are cache hits
+_ts_cache = (0, "")
+
+
+def _iso_timestamp() -> str:
+    """Current ISO timestamp, recomputed at most once per second"""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, datetime.now().isoformat())
+    return _ts_cache[1]
+
+
 # Health status mapping
 HEALTH_STATUS = {
     0: "NORMAL",
-    1: "WARNING", 
+    1: "WARNING",
     2: "CRITICAL"
 }
 
+# Serializes the load so concurrent first requests don't deserialize the
+# models twice; the hot path stays a single lock-free None check
+_load_lock = threading.Lock()
+
 
 def load_models():
     """Load all ML models and metadata"""
     global _classifier, _regressor, _scaler, _metadata
-    
+    global _feature_names, _has_cycle, _initial_rul
+
     if _classifier is not None:
         return True
-    
-    try:
-        if os.path.exists(CLASSIFIER_PATH):
-            _classifier = joblib.load(CLASSIFIER_PATH)
-            print(f"[OK] Health Classifier loaded")
-        
-        if os.path.exists(REGRESSOR_PATH):
-            _regressor = joblib.load(REGRESSOR_PATH)
-            print(f"[OK] RUL Regressor loaded")
-        
-        if os.path.exists(SCALER_PATH):
-            _scaler = joblib.load(SCALER_PATH)
-            print(f"[OK] Feature Scaler loaded")
-        
-        if os.path.exists(METADATA_PATH):
-            with open(METADATA_PATH, 'r') as f:
-                _metadata = json.load(f)
-            print(f"[OK] Model Metadata loaded (v{_metadata.get('model_version', '1.0')})")
-        
-        return _classifier is not None and _regressor is not None
-    
-    except Exception as e:
-        print(f"[ERROR] Failed to load models: {e}")
-        return False
+
+    with _load_lock:
+        # Double-checked: another thread may have finished while we waited
+        if _classifier is not None:
+            return True
+
+        try:
+            if _HAS_ONNXRUNTIME and os.path.exists(ONNX_CLASSIFIER_PATH):
+                _classifier = _OnnxClassifier(ONNX_CLASSIFIER_PATH)
+                logger.info("Health Classifier loaded (ONNX)")
+            elif os.path.exists(CLASSIFIER_PATH):
+                # Plain load: the training scripts write these pickles
+                # LZ4-compressed, and joblib ignores mmap_mode (with a
+                # warning) for compressed files
+                _classifier = joblib.load(CLASSIFIER_PATH)
+                logger.info("Health Classifier loaded")
+
+            if _HAS_ONNXRUNTIME and os.path.exists(ONNX_REGRESSOR_PATH):
+                _regressor = _OnnxRegressor(ONNX_REGRESSOR_PATH)
+                logger.info("RUL Regressor loaded (ONNX)")
+            elif os.path.exists(REGRESSOR_PATH):
+                _regressor = joblib.load(REGRESSOR_PATH)
+                logger.info("RUL Regressor loaded")
+
+            if os.path.exists(SCALER_PATH):
+                _scaler = joblib.load(SCALER_PATH)
+                logger.info("Feature Scaler loaded")
+
+            if os.path.exists(METADATA_PATH):
+                with open(METADATA_PATH, 'r') as f:
+                    _metadata = json.load(f)
+                logger.info("Model Metadata loaded (v%s)", _metadata.get('model_version', '1.0'))
+
+            if _metadata:
+                _feature_names = _metadata.get('feature_names', [])
+                _has_cycle = 'cycle' in _feature_names
+                _initial_rul = _metadata.get('initial_rul', 150)
+
+            # Cached predictions belong to the previous estimators
+            _predict_core.cache_clear()
+
+            return _classifier is not None and _regressor is not None
+
+        except Exception as e:
+            logger.error("Failed to load models: %s", e)
+            return False
 
 
 def get_model_status() -> Dict[str, Any]:
@@ -120,88 +268,162 @@ def predict_health(
     # Load models if not loaded
     if not load_models():
         return _fallback_prediction(temperature, vibration, current, pressure, runtime_hours, cycle)
-    
+
     try:
-        # Get feature names from metadata to determine if cycle is included
-        feature_names = _metadata.get('feature_names', []) if _metadata else []
-        has_cycle = 'cycle' in feature_names
-        
-        # Prepare features in correct order
-        if has_cycle:
+        # Last feature slot: cycle if the model was trained with it, else runtime
+        if _has_cycle:
             # If cycle is a feature, use it (estimate from runtime_hours if not provided)
             if cycle is None:
                 cycle = runtime_hours // 8 if runtime_hours > 0 else 0  # Estimate: 8 hours per cycle
-            features = np.array([[temperature, vibration, current, pressure, cycle]])
+            last_feature = int(cycle)
         else:
             # Legacy: no cycle feature
-            features = np.array([[temperature, vibration, current, pressure, runtime_hours]])
-        
-        # Scale features
-        features_scaled = _scaler.transform(features)
-        
-        # Predict health status
-        health_class = _classifier.predict(features_scaled)[0]
-        health_proba = _classifier.predict_proba(features_scaled)[0]
-        confidence = float(np.max(health_proba))
-        health_status = HEALTH_STATUS.get(int(health_class), "UNKNOWN")
-        
-        # Predict RUL
-        predicted_rul = float(_regressor.predict(features_scaled)[0])
-        
-        # Get Initial RUL from metadata or use default
-        initial_rul = _metadata.get('initial_rul', 150) if _metadata else 150
-        predicted_rul = max(0, min(initial_rul, predicted_rul))  # Clamp to valid range
-        
-        # Calculate health percentage: Health = (Predicted_RUL / Initial_RUL) * 100
-        health_percentage = min(100, max(0, (predicted_rul / initial_rul) * 100))
-        
-        # Determine root cause based on sensor readings
-        root_cause = _analyze_root_cause(temperature, vibration, current, pressure, health_status)
-        
-        return {
-            "health_status": health_status,
-            "predicted_rul": round(predicted_rul, 2),
-            "confidence_score": round(confidence, 4),
-            "health_percentage": round(health_percentage, 2),
-            "risk_level": health_status.lower() if health_status != "NORMAL" else "low",
-            "root_cause": root_cause,
-            "sensor_analysis": {
-                "temperature": _analyze_sensor(temperature, "temperature"),
-                "vibration": _analyze_sensor(vibration, "vibration"),
-                "current": _analyze_sensor(current, "current"),
-                "pressure": _analyze_sensor(pressure, "pressure")
-            },
-            "timestamp": datetime.now().isoformat()
-        }
-        
+            last_feature = int(runtime_hours)
+
+        # Quantize to sensor resolution so slowly-drifting streams hit the
+        # cache instead of re-running the ensembles
+        health_class, confidence, predicted_rul = _predict_core(
+            int(round(temperature * 10)),   # 0.1 °C steps
+            int(round(vibration * 20)),     # 0.05 mm/s steps
+            int(round(current * 10)),       # 0.1 A steps
+            int(round(pressure * 10)),      # 0.1 PSI steps
+            last_feature,
+            _has_cycle
+        )
+        health_status = HEALTH_STATUS.get(health_class, "UNKNOWN")
+
+        return _assemble_result(
+            temperature, vibration, current, pressure,
+            health_status, predicted_rul, confidence
+        )
+
     except Exception as e:
         print(f"Prediction error: {e}")
         return _fallback_prediction(temperature, vibration, current, pressure, runtime_hours)
 
 
+@lru_cache(maxsize=8192)
+def _predict_core(
+    temp_q: int,
+    vib_q: int,
+    cur_q: int,
+    pres_q: int,
+    last_q: int,
+    has_cycle: bool
+) -> Tuple[int, float, float]:
+    """
+    Run scaler + classifier + regressor for one quantized reading.
+
+    Keys are quantized ints so cache hits don't depend on float identity;
+    the cache is cleared whenever load_models reloads the estimators.
+    Returns (health_class, confidence, predicted_rul).
+    """
+    # Reuse one preallocated row per thread instead of building a fresh
+    # ndarray every call; the scaler copies on transform, so the buffer is
+    # never aliased by the estimators
+    # float32: sensor resolution is ~0.1 unit, sklearn's trees store
+    # thresholds as float32 internally anyway, and halving the element size
+    # halves memory traffic through the scaler and both ensembles
+    features = getattr(_tls, "feat_buf", None)
+    if features is None:
+        features = _tls.feat_buf = np.empty((1, 5), dtype=np.float32)
+
+    features[0, 0] = temp_q / 10
+    features[0, 1] = vib_q / 20
+    features[0, 2] = cur_q / 10
+    features[0, 3] = pres_q / 10
+    features[0, 4] = last_q
+
+    # Newer models are trained on raw features (trees are scale-invariant)
+    # and ship without a scaler; only transform when one was loaded
+    features_scaled = _scaler.transform(features) if _scaler is not None else features
+
+    # One ensemble traversal: predict() is just argmax over predict_proba,
+    # so deriving the class from the probabilities halves the tree walks.
+    # Both ensembles share the scaled input and run concurrently.
+    proba_future = _inference_pool.submit(_classifier.predict_proba, features_scaled)
+    rul_future = _inference_pool.submit(_regressor.predict, features_scaled)
+
+    health_proba = proba_future.result()[0]
+    health_class = int(np.argmax(health_proba))
+    confidence = float(health_proba[health_class])
+
+    predicted_rul = float(rul_future.result()[0])
+
+    return health_class, confidence, predicted_rul
+
+
+def _assemble_result(
+    temperature: float,
+    vibration: float,
+    current: float,
+    pressure: float,
+    health_status: str,
+    predicted_rul: float,
+    confidence: float
+) -> Dict[str, Any]:
+    """Build the prediction response dict from model outputs"""
+    initial_rul = _initial_rul
+    predicted_rul = max(0, min(initial_rul, predicted_rul))  # Clamp to valid range
+
+    # Calculate health percentage: Health = (Predicted_RUL / Initial_RUL) * 100
+    health_percentage = min(100, max(0, (predicted_rul / initial_rul) * 100))
+
+    # Determine root cause based on sensor readings
+    root_cause = _analyze_root_cause(temperature, vibration, current, pressure, health_status)
+
+    return {
+        "health_status": health_status,
+        "predicted_rul": round(predicted_rul, 2),
+        "confidence_score": round(confidence, 4),
+        "health_percentage": round(health_percentage, 2),
+        "risk_level": health_status.lower() if health_status != "NORMAL" else "low",
+        "root_cause": root_cause,
+        "sensor_analysis": {
+            "temperature": _analyze_sensor(temperature, "temperature"),
+            "vibration": _analyze_sensor(vibration, "vibration"),
+            "current": _analyze_sensor(current, "current"),
+            "pressure": _analyze_sensor(pressure, "pressure")
+        },
+        "timestamp": _iso_timestamp()
+    }
+
+
+@njit(cache=True)
+def _sensor_status_code(value: float, normal: float, warning: float, critical: float) -> int:
+    """Classify one sensor value against its thresholds (0..3)"""
+    if value < normal:
+        return 0  # NORMAL
+    elif value < warning:
+        return 1  # ELEVATED
+    elif value < critical:
+        return 2  # WARNING
+    return 3      # CRITICAL
+
+
+_SENSOR_STATUS_NAMES = ("NORMAL", "ELEVATED", "WARNING", "CRITICAL")
+
+# Sensor thresholds, built once instead of per analysis call
+_SENSOR_THRESHOLDS = {
+    "temperature": {"normal": 65, "warning": 80, "critical": 95},
+    "vibration": {"normal": 3.5, "warning": 6.0, "critical": 8.0},
+    "current": {"normal": 15, "warning": 20, "critical": 28},
+    "pressure": {"normal": 110, "warning": 125, "critical": 150}
+}
+_UNKNOWN_SENSOR_THRESHOLDS = {"normal": 0, "warning": 0, "critical": float('inf')}
+
+
 def _analyze_sensor(value: float, sensor_type: str) -> Dict[str, Any]:
     """Analyze individual sensor reading"""
-    thresholds = {
-        "temperature": {"normal": 65, "warning": 80, "critical": 95},
-        "vibration": {"normal": 3.5, "warning": 6.0, "critical": 8.0},
-        "current": {"normal": 15, "warning": 20, "critical": 28},
-        "pressure": {"normal": 110, "warning": 125, "critical": 150}
-    }
-    
-    thresh = thresholds.get(sensor_type, {"normal": 0, "warning": 0, "critical": float('inf')})
-    
-    if value < thresh["normal"]:
-        status = "NORMAL"
-    elif value < thresh["warning"]:
-        status = "ELEVATED"
-    elif value < thresh["critical"]:
-        status = "WARNING"
-    else:
-        status = "CRITICAL"
-    
+    thresh = _SENSOR_THRESHOLDS.get(sensor_type, _UNKNOWN_SENSOR_THRESHOLDS)
+
+    code = _sensor_status_code(
+        float(value), float(thresh["normal"]), float(thresh["warning"]), float(thresh["critical"])
+    )
+
     return {
         "value": round(value, 2),
-        "status": status,
+        "status": _SENSOR_STATUS_NAMES[code],
         "threshold_warning": thresh["warning"],
         "threshold_critical": thresh["critical"]
     }
@@ -240,8 +462,13 @@ def _analyze_root_cause(temp: float, vib: float, curr: float, pres: float, healt
     return " | ".join(causes) if causes else "Monitoring recommended - elevated sensor readings"
 
 
-def _fallback_prediction(temp: float, vib: float, curr: float, pres: float, runtime: int, cycle: int = None) -> Dict[str, Any]:
-    """Fallback prediction when models are not available"""
+@njit(cache=True)
+def _fallback_core(temp: float, vib: float, curr: float, pres: float, cycle: int) -> Tuple[int, float, float]:
+    """
+    Scalar kernel for the rule-based fallback; cycle < 0 means "not provided".
+    Returns (status_code, rul, risk_score). Compiled to native by Numba when
+    available, plain Python otherwise.
+    """
     # Simple rule-based prediction with cycle consideration
     risk_score = (
         (temp - 50) / 50 * 0.25 +
@@ -249,31 +476,50 @@ def _fallback_prediction(temp: float, vib: float, curr: float, pres: float, runt
         (curr - 10) / 20 * 0.25 +
         (pres - 90) / 60 * 0.15
     )
-    
+
     # Add cycle-based degradation if cycle is provided
-    if cycle is not None:
+    if cycle >= 0:
         cycle_factor = min(1.0, cycle / 150.0)  # Normalize cycle
         risk_score = risk_score * 0.7 + cycle_factor * 0.3  # Blend sensor and cycle
-    
-    risk_score = max(0, min(1, risk_score))
-    
-    initial_rul = 150  # Default initial RUL
-    
+
+    risk_score = max(0.0, min(1.0, risk_score))
+
+    initial_rul = 150.0  # Default initial RUL
+
     if risk_score < 0.3:
-        health_status = "NORMAL"
+        status_code = 0
         rul = initial_rul * (1 - risk_score * 0.3) + np.random.randint(-10, 10)
     elif risk_score < 0.6:
-        health_status = "WARNING"
+        status_code = 1
         rul = initial_rul * (0.6 - risk_score * 0.3) + np.random.randint(-15, 15)
     else:
-        health_status = "CRITICAL"
+        status_code = 2
         rul = initial_rul * (0.3 - risk_score * 0.3) + np.random.randint(-10, 10)
-    
-    rul = max(0, min(initial_rul, rul))
-    
+
+    rul = max(0.0, min(initial_rul, rul))
+
+    return status_code, rul, risk_score
+
+
+if _HAS_NUMBA:
+    # Trigger compilation at import so the first request doesn't pay for it
+    _fallback_core(50.0, 2.0, 10.0, 100.0, -1)
+    _sensor_status_code(0.0, 1.0, 2.0, 3.0)
+
+
+def _fallback_prediction(temp: float, vib: float, curr: float, pres: float, runtime: int, cycle: int = None) -> Dict[str, Any]:
+    """Fallback prediction when models are not available"""
+    status_code, rul, risk_score = _fallback_core(
+        float(temp), float(vib), float(curr), float(pres),
+        -1 if cycle is None else int(cycle)
+    )
+    health_status = HEALTH_STATUS.get(status_code, "UNKNOWN")
+
+    initial_rul = 150  # Default initial RUL
+
     # Calculate health percentage: Health = (RUL / Initial_RUL) * 100
     health_percentage = (rul / initial_rul) * 100
-    
+
     return {
         "health_status": health_status,
         "predicted_rul": rul,
@@ -287,25 +533,84 @@ def _fallback_prediction(temp: float, vib: float, curr: float, pres: float, runt
             "current": _analyze_sensor(curr, "current"),
             "pressure": _analyze_sensor(pres, "pressure")
         },
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _iso_timestamp(),
         "note": "Using fallback prediction - models not loaded"
     }
 
 
 def predict_batch(sensor_data_list: list) -> list:
-    """Predict health for multiple sensor readings"""
-    results = []
+    """
+    Predict health for multiple sensor readings.
+
+    All readings go through the scaler, classifier and regressor in one
+    matrix call each instead of a model invocation per row.
+    """
+    if not sensor_data_list:
+        return []
+
+    if not load_models():
+        return [
+            _fallback_prediction(
+                data.get("temperature", 55),
+                data.get("vibration", 2.5),
+                data.get("current", 12),
+                data.get("pressure", 100),
+                data.get("runtime_hours", 0),
+                data.get("cycle", None)
+            )
+            for data in sensor_data_list
+        ]
+
+    has_cycle = _has_cycle
+
+    rows = []
+    readings = []
     for data in sensor_data_list:
-        result = predict_health(
-            temperature=data.get("temperature", 55),
-            vibration=data.get("vibration", 2.5),
-            current=data.get("current", 12),
-            pressure=data.get("pressure", 100),
-            runtime_hours=data.get("runtime_hours", 0),
-            cycle=data.get("cycle", None)
-        )
-        results.append(result)
-    return results
+        temperature = data.get("temperature", 55)
+        vibration = data.get("vibration", 2.5)
+        current = data.get("current", 12)
+        pressure = data.get("pressure", 100)
+        runtime_hours = data.get("runtime_hours", 0)
+        cycle = data.get("cycle", None)
+
+        if has_cycle:
+            if cycle is None:
+                cycle = runtime_hours // 8 if runtime_hours > 0 else 0  # Estimate: 8 hours per cycle
+            rows.append([temperature, vibration, current, pressure, cycle])
+        else:
+            rows.append([temperature, vibration, current, pressure, runtime_hours])
+
+        readings.append((temperature, vibration, current, pressure))
+
+    try:
+        features = np.array(rows, dtype=np.float32)
+        features_scaled = _scaler.transform(features) if _scaler is not None else features
+
+        # Class and confidence both come from one predict_proba traversal;
+        # classifier and regressor run concurrently over the shared input
+        proba_future = _inference_pool.submit(_classifier.predict_proba, features_scaled)
+        rul_future = _inference_pool.submit(_regressor.predict, features_scaled)
+
+        health_probas = proba_future.result()
+        health_classes = np.argmax(health_probas, axis=1)
+        predicted_ruls = rul_future.result()
+
+        return [
+            _assemble_result(
+                temperature, vibration, current, pressure,
+                HEALTH_STATUS.get(int(health_classes[i]), "UNKNOWN"),
+                float(predicted_ruls[i]),
+                float(health_probas[i, health_classes[i]])
+            )
+            for i, (temperature, vibration, current, pressure) in enumerate(readings)
+        ]
+
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        return [
+            _fallback_prediction(temperature, vibration, current, pressure, 0)
+            for temperature, vibration, current, pressure in readings
+        ]
 
 
 # Initialize models on module load
@@ -5,6 +5,7 @@ Production-ready validation with proper error handling
 
 import math
 from typing import Tuple, Optional
+import numpy as np
 from fastapi import HTTPException, status
 
 
@@ -18,6 +19,15 @@ SENSOR_RANGES = {
     "cycle": {"min": 0, "max": 1000, "unit": "cycles"},
 }
 
+# Bounds in fixed slot order (temperature, vibration, current, pressure,
+# runtime_hours, cycle) for the vectorized fast path
+_RANGE_MIN = np.array([SENSOR_RANGES[k]["min"] for k in
+                       ("temperature", "vibration", "current", "pressure", "runtime_hours", "cycle")],
+                      dtype=np.float64)
+_RANGE_MAX = np.array([SENSOR_RANGES[k]["max"] for k in
+                       ("temperature", "vibration", "current", "pressure", "runtime_hours", "cycle")],
+                      dtype=np.float64)
+
 
 def validate_sensor_input(
     temperature: float,
@@ -46,6 +56,33 @@ def validate_sensor_input(
     Raises:
         HTTPException: If validation fails and strict=True
     """
+    # Fast path: stack everything into one vector and do the NaN/Inf and
+    # range checks as three C-level array comparisons. Anything unusual
+    # (non-numeric, NaN, out of range) drops into the per-field path below,
+    # which produces the detailed errors / clamping.
+    try:
+        values = np.array([
+            temperature,
+            vibration,
+            current,
+            100.0 if pressure is None else pressure,
+            0 if runtime_hours is None else runtime_hours,
+            0 if cycle is None else cycle,
+        ], dtype=np.float64)
+        if (np.isfinite(values).all()
+                and (values >= _RANGE_MIN).all()
+                and (values <= _RANGE_MAX).all()):
+            return (
+                float(values[0]),
+                float(values[1]),
+                float(values[2]),
+                float(values[3]),
+                int(values[4]),
+                None if cycle is None else int(values[5]),
+            )
+    except (TypeError, ValueError):
+        pass
+
     errors = []
     
     # Check for NaN or Infinity
@@ -3,7 +3,10 @@ Database Models
 SQLAlchemy ORM models for users, sessions, and MFA
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey,
+    Text, Float, Index, Uuid
+)
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -11,6 +14,15 @@ import uuid
 
 Base = declarative_base()
 
+# SQLite needs a plain INTEGER primary key for rowid autoincrement
+BigIntPK = BigInteger().with_variant(Integer, "sqlite")
+
+# Stored natively as 16-byte UUID on PostgreSQL and CHAR(32) on SQLite -
+# roughly half the btree footprint of the old String(36) hex form.
+# as_uuid=False keeps the Python-side values as strings, so tokens,
+# schemas and existing route code are unchanged.
+UuidPK = Uuid(as_uuid=False)
+
 
 def generate_uuid():
     return str(uuid.uuid4())
@@ -20,7 +32,7 @@ class User(Base):
     """User account model"""
     __tablename__ = "users"
     
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(UuidPK, primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=True)  # Null for OAuth users
     
@@ -63,8 +75,8 @@ class Session(Base):
     """User session for JWT refresh tokens"""
     __tablename__ = "sessions"
     
-    id = Column(String(36), primary_key=True, default=generate_uuid)
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UuidPK, primary_key=True, default=generate_uuid)
+    user_id = Column(UuidPK, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     refresh_token = Column(String(500), unique=True, nullable=False)
     device_info = Column(String(255), nullable=True)
@@ -72,10 +84,15 @@ class Session(Base):
     
     is_valid = Column(Boolean, default=True)
     expires_at = Column(DateTime, nullable=False)
-    
+
     created_at = Column(DateTime, server_default=func.now())
     last_used_at = Column(DateTime, server_default=func.now())
-    
+
+    # Token-revocation sweeps filter on (user_id, is_valid)
+    __table_args__ = (
+        Index("ix_sessions_user_valid", "user_id", "is_valid"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="sessions")
     
@@ -88,7 +105,7 @@ class LoginAttempt(Base):
     __tablename__ = "login_attempts"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    user_id = Column(UuidPK, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     email = Column(String(255), nullable=False)
     ip_address = Column(String(50), nullable=True)
     
@@ -106,7 +123,7 @@ class OTPVerification(Base):
     __tablename__ = "otp_verifications"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UuidPK, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     otp_code = Column(String(6), nullable=False)
     purpose = Column(String(50), nullable=False)  # login, setup_mfa, reset_password
@@ -120,7 +137,7 @@ class Machine(Base):
     """Machine/Equipment for monitoring"""
     __tablename__ = "machines"
     
-    id = Column(String(36), primary_key=True, default=generate_uuid)
+    id = Column(UuidPK, primary_key=True, default=generate_uuid)
     machine_id = Column(String(50), unique=True, nullable=False, index=True)
     name = Column(String(255), nullable=False)
     machine_type = Column(String(100), nullable=True)
@@ -147,20 +164,44 @@ class SensorReading(Base):
     """Sensor data from machines"""
     __tablename__ = "sensor_readings"
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    machine_id = Column(String(36), ForeignKey("machines.id", ondelete="CASCADE"), nullable=False)
-    
+    id = Column(BigIntPK, primary_key=True, autoincrement=True)
+    machine_id = Column(UuidPK, ForeignKey("machines.id", ondelete="CASCADE"), nullable=False)
+
     temperature = Column(Float, nullable=False)
     vibration = Column(Float, nullable=False)
     current = Column(Float, nullable=False)
-    
+
     # Prediction results
     predicted_rul = Column(Float, nullable=True)
     health_percentage = Column(Float, nullable=True)
     risk_level = Column(String(20), nullable=True)
     root_cause = Column(Text, nullable=True)
-    
-    timestamp = Column(DateTime, server_default=func.now())
-    
+
+    timestamp = Column(DateTime, server_default=func.now(), index=True)
+
+    # Dashboard queries are "latest N readings for a machine"; the
+    # composite index turns that into an index range scan instead of a
+    # full scan plus sort over the machine's rows
+    __table_args__ = (
+        Index("ix_readings_machine_ts", "machine_id", "timestamp"),
+    )
+
     # Relationships
     machine = relationship("Machine", back_populates="sensor_readings")
+
+
+async def bulk_insert_readings(session, rows: list) -> None:
+    """
+    Bulk-insert sensor readings with one executemany statement.
+
+    Skips the ORM identity map and unit-of-work bookkeeping, so streaming
+    ingestion is bounded by the database round-trip rather than Python.
+    Each row dict must include machine_id and the sensor columns
+    (temperature, vibration, current); prediction fields are optional.
+    Pairs with ml_model.batch_predict, whose output dicts can be merged
+    straight into the rows.
+    """
+    if not rows:
+        return
+    await session.execute(SensorReading.__table__.insert(), rows)
+    await session.commit()
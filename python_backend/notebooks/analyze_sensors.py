@@ -1,33 +1,47 @@
-                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                    11111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111                                                                 111                                                    """Analyze NASA sensor statistics to calibrate mapping"""
+"""Analyze NASA sensor statistics to calibrate mapping"""
 import sqlite3
-import pandas as pd
 import os
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uptimeai.db")
 conn = sqlite3.connect(DB_PATH)
 
-# Get sensor statistics from training data (only selected sensors)
-df = pd.read_sql('SELECT s2, s3, s4, s7, s8, s9, s11, s12, s13, s14, s15, s17, s20, s21, RUL FROM nasa_training_data', conn)
+SENSOR_COLS = ['s2', 's3', 's4', 's7', 's8', 's9', 's11', 's12', 's13', 's14', 's15', 's17', 's20', 's21']
+STATE_COLS = ['s2', 's3', 's4', 's7', 's11', 's12', 's13']
+
+# Aggregate inside SQLite instead of pulling the whole table into pandas:
+# the scan runs in C and only a few hundred bytes of stats come back
+stats_sql = ', '.join(f'MIN({c}), MAX({c}), AVG({c})' for c in SENSOR_COLS)
+row = conn.execute(
+    f'SELECT {stats_sql}, MIN(RUL), MAX(RUL), AVG(RUL) FROM nasa_training_data'
+).fetchone()
 
 print('=== Sensor Statistics (NASA FD002) ===')
-for col in ['s2', 's3', 's4', 's7', 's8', 's9', 's11', 's12', 's13', 's14', 's15', 's17', 's20', 's21']:
-    print(f'{col}: min={df[col].min():.2f}, max={df[col].max():.2f}, mean={df[col].mean():.2f}')
+for i, col in enumerate(SENSOR_COLS):
+    cmin, cmax, cmean = row[i * 3:i * 3 + 3]
+    print(f'{col}: min={cmin:.2f}, max={cmax:.2f}, mean={cmean:.2f}')
 
 print()
 print('=== RUL Distribution ===')
-print(f'RUL: min={df["RUL"].min()}, max={df["RUL"].max()}, mean={df["RUL"].mean():.2f}')
+rul_min, rul_max, rul_mean = row[len(SENSOR_COLS) * 3:]
+print(f'RUL: min={rul_min}, max={rul_max}, mean={rul_mean:.2f}')
 
 # Show correlation (high RUL = healthy, low RUL = degraded)
+state_sql = ', '.join(f'AVG({c})' for c in STATE_COLS)
+
 print()
 print('=== Sensor values at HEALTHY state (RUL > 100) ===')
-healthy = df[df['RUL'] > 100]
-for col in ['s2', 's3', 's4', 's7', 's11', 's12', 's13']:
-    print(f'{col}: mean={healthy[col].mean():.2f}')
+healthy = conn.execute(
+    f'SELECT {state_sql} FROM nasa_training_data WHERE RUL > 100'
+).fetchone()
+for col, mean in zip(STATE_COLS, healthy):
+    print(f'{col}: mean={mean:.2f}')
 
 print()
 print('=== Sensor values at DEGRADED state (RUL < 20) ===')
-degraded = df[df['RUL'] < 20]
-for col in ['s2', 's3', 's4', 's7', 's11', 's12', 's13']:
-    print(f'{col}: mean={degraded[col].mean():.2f}')
+degraded = conn.execute(
+    f'SELECT {state_sql} FROM nasa_training_data WHERE RUL < 20'
+).fetchone()
+for col, mean in zip(STATE_COLS, degraded):
+    print(f'{col}: mean={mean:.2f}')
 
 conn.close()
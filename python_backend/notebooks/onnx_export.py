@@ -0,0 +1,61 @@
+"""
+Shared ONNX export step for the training scripts
+
+Writes the .onnx + .meta.json artifact pair next to the pickled model,
+matching what ml_model.load_model looks for on the serving side: the
+ONNX graph stores thresholds and leaf values as packed float32 arrays
+that onnxruntime walks in vectorized row chunks, and the sidecar holds
+the calibrated tree-variance confidence so serving never needs the
+sklearn forest.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+def export_onnx(model, model_path, X_sample):
+    """
+    Convert a fitted model to ONNX alongside its pickle.
+
+    X_sample should be a small batch of already-scaled feature rows;
+    it is used to calibrate the confidence written to the sidecar.
+    Quietly skips when skl2onnx isn't installed - the export is an
+    optional acceleration, not part of training.
+    """
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        print("⚠️ skl2onnx not installed - skipping ONNX export")
+        return
+
+    n_features = model.n_features_in_
+    onx = convert_sklearn(
+        model,
+        initial_types=[('input', FloatTensorType([None, n_features]))]
+    )
+    onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+    with open(onnx_path, 'wb') as f:
+        f.write(onx.SerializeToString())
+
+    # Forest ensembles expose per-tree leaves; use their spread over the
+    # sample to calibrate the confidence the backend reports when
+    # serving from the compiled graph
+    if hasattr(model, 'estimators_'):
+        leaf_ids = model.apply(X_sample)
+        tree_preds = np.column_stack([
+            est.tree_.value[leaf_ids[:, i], 0, 0]
+            for i, est in enumerate(model.estimators_)
+        ])
+        confidences = 1 - (tree_preds.std(axis=1)
+                           / (tree_preds.mean(axis=1) + 1e-6))
+        confidences = np.clip(confidences, 0.5, 0.99)
+        with open(onnx_path + '.meta.json', 'w') as f:
+            json.dump({
+                'n_features': int(n_features),
+                'confidence': round(float(confidences.mean()), 3)
+            }, f)
+
+    print(f"✅ ONNX model exported to {onnx_path}")
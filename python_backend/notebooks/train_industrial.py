@@ -10,17 +10,65 @@ import sqlite3
 import numpy as np
 import pandas as pd
 import joblib
+
+# Intel oneDAL acceleration when scikit-learn-intelex is installed
+# (x86 only); must run before the sklearn imports below
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
+
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from fast_scaler import FastScaler  # noqa: E402 - needs the path insert above
+from onnx_export import export_onnx  # noqa: E402
+
+# Optional numba JIT, same guard as the backend's ml_model: when absent
+# the synthesis falls back to the vectorized numpy path below
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
 ML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml")
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uptimeai.db")
 
 
+@njit(parallel=True, fastmath=True, cache=True)
+def _synth_kernel(deg, noise, base, slope, sigma, lo, hi, out):
+    """Fused base + deg*slope + noise*sigma then clamp, one pass"""
+    for i in prange(deg.shape[0]):
+        v = base + deg[i] * slope + noise[i] * sigma
+        out[i] = min(max(v, lo), hi)
+
+
+def _synthesize(deg, noise, base, slope, sigma, lo, hi):
+    """
+    Build one sensor channel from the degradation curve. With numba the
+    whole expression runs as a single parallel loop - one sweep through
+    memory instead of four temporaries; otherwise np.clip(out=) keeps
+    the numpy path down to one materialized intermediate.
+    """
+    out = np.empty_like(deg)
+    if _HAS_NUMBA:
+        _synth_kernel(deg, noise, base, slope, sigma, lo, hi, out)
+    else:
+        np.clip(base + deg * slope + noise * sigma, lo, hi, out=out)
+    return out
+
+
 def generate_industrial_data_from_nasa():
     """
     Generate industrial sensor data based on NASA FD002 degradation patterns
@@ -29,35 +77,32 @@ def generate_industrial_data_from_nasa():
     print("📊 Generating industrial sensor data from NASA patterns...")
     
     conn = sqlite3.connect(DB_PATH)
-    
-    # Get RUL distribution from NASA data
-    nasa_df = pd.read_sql('SELECT RUL FROM nasa_training_data', conn)
+
+    # Only one column is needed - np.fromiter straight off the cursor
+    # skips the DataFrame construction path entirely
+    cur = conn.execute('SELECT RUL FROM nasa_training_data')
+    rul_values = np.fromiter((row[0] for row in cur), dtype=np.float32)
     conn.close()
-    
-    n_samples = len(nasa_df)
-    rul_values = nasa_df['RUL'].values
+
+    n_samples = len(rul_values)
     rul_values = np.clip(rul_values, 0, 125)  # Cap at 125
-    
+
     # Calculate degradation factor (0 = new, 1 = end of life)
     degradation = 1 - (rul_values / 125)
-    
-    # Generate correlated industrial sensor readings
-    np.random.seed(42)
-    
+
+    # Generate correlated industrial sensor readings - one RNG draw
+    # covers all three sensors' noise instead of three separate calls
+    rng = np.random.default_rng(42)
+    noise = rng.normal(size=(3, n_samples))
+
     # Temperature: Normal 45-55°C, degraded 70-95°C
-    base_temp = 45 + degradation * 45
-    temperature = base_temp + np.random.normal(0, 3, n_samples)
-    temperature = np.clip(temperature, 35, 100)
-    
+    temperature = _synthesize(degradation, noise[0], 45.0, 45.0, 3.0, 35.0, 100.0)
+
     # Vibration: Normal 0.5-2 mm/s, degraded 4-9 mm/s
-    base_vib = 0.5 + degradation * 7.5
-    vibration = base_vib + np.random.normal(0, 0.5, n_samples)
-    vibration = np.clip(vibration, 0.3, 10)
-    
+    vibration = _synthesize(degradation, noise[1], 0.5, 7.5, 0.5, 0.3, 10.0)
+
     # Current: Normal 10-14A, degraded 18-28A
-    base_cur = 10 + degradation * 15
-    current = base_cur + np.random.normal(0, 1.5, n_samples)
-    current = np.clip(current, 8, 30)
+    current = _synthesize(degradation, noise[2], 10.0, 15.0, 1.5, 8.0, 30.0)
     
     df = pd.DataFrame({
         'temperature': temperature,
@@ -100,8 +145,10 @@ def train_industrial_model(df):
     """Train RandomForest model on industrial sensor data"""
     print("\n🌲 Training RandomForest model on industrial sensor data...")
     
-    X = df[['temperature', 'vibration', 'current']].values
-    y = df['RUL'].values
+    # float32: matches sklearn's internal tree dtype and halves the
+    # footprint of the feature matrix
+    X = df[['temperature', 'vibration', 'current']].to_numpy(dtype=np.float32)
+    y = df['RUL'].to_numpy(dtype=np.float32)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -112,17 +159,21 @@ def train_industrial_model(df):
     print(f"   Test samples: {len(X_test)}")
     print(f"   Features: 3 (temperature, vibration, current)")
     
-    # Scale features
-    scaler = StandardScaler()
+    # Scale features in place - the split arrays are private copies
+    scaler = FastScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Train model
+    # Train model. Depth 10 / 20-sample leaves: the 3-feature mapping is
+    # smooth, so deep trees only memorize noise while tripling the walk
+    # cost at serving time.
     model = RandomForestRegressor(
         n_estimators=100,
-        max_depth=15,
+        max_depth=10,
         min_samples_split=5,
-        min_samples_leaf=2,
+        min_samples_leaf=20,
+        max_features='sqrt',  # decorrelates trees even with 3 features
+        bootstrap=True,
         random_state=42,
         n_jobs=-1
     )
@@ -140,15 +191,13 @@ def train_industrial_model(df):
     print(f"   RMSE: {rmse:.2f} cycles")
     print(f"   R²:   {r2:.3f}")
     
-    # Feature importance
-    importance = pd.DataFrame({
-        'feature': ['temperature', 'vibration', 'current'],
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
+    # Feature importance - read the per-tree aggregation once and
+    # argsort it instead of the DataFrame/sort_values round-trip
+    feature_names = ['temperature', 'vibration', 'current']
+    imps = model.feature_importances_
     print(f"\n🔍 Feature Importance:")
-    for _, row in importance.iterrows():
-        print(f"   {row['feature']}: {row['importance']:.4f}")
+    for i in np.argsort(imps)[::-1]:
+        print(f"   {feature_names[i]}: {imps[i]:.4f}")
     
     return model, scaler, {
         'mae': mae,
@@ -166,7 +215,11 @@ def save_model(model, scaler, metrics):
     model_path = os.path.join(ML_DIR, "industrial_model.pkl")
     scaler_path = os.path.join(ML_DIR, "industrial_scaler.pkl")
     
-    joblib.dump(model, model_path)
+    # Uncompressed on purpose: ml_model.load_model memory-maps these so
+    # worker processes share one page-cache copy, and joblib silently
+    # ignores mmap_mode for compressed pickles (same reasoning as
+    # ml_model.train_model's own dump)
+    joblib.dump(model, model_path, compress=0)
     joblib.dump(scaler, scaler_path)
     
     print(f"\n✅ Model saved to {model_path}")
@@ -201,6 +254,12 @@ def main():
     
     # Save model
     save_model(model, scaler, metrics)
+
+    # Compiled artifact for the serving fast path (ml_model prefers the
+    # industrial model, so this is the graph the API actually runs)
+    features = df[['temperature', 'vibration', 'current']].to_numpy(dtype=np.float32)
+    sample = scaler.transform(features[:256])
+    export_onnx(model, os.path.join(ML_DIR, "industrial_model.pkl"), sample)
     
     print("\n" + "=" * 60)
     print("  Training Complete!")
@@ -14,9 +14,13 @@ Features: temperature, vibration, current, pressure, runtime_hours
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.ensemble import (
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.model_selection import (
+    train_test_split, cross_val_score, StratifiedShuffleSplit
+)
+from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     classification_report, confusion_matrix,
@@ -25,8 +29,53 @@ from sklearn.metrics import (
 import joblib
 import json
 import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Optional XGBoost: its hist tree method bins features into <=256
+# integer buckets so split search scans bins instead of sorted values,
+# and it parallelizes across cores (or a GPU). Guarded so the sklearn
+# GradientBoosting path below keeps working where it isn't installed.
+try:
+    import xgboost as xgb
+    _HAS_XGB = True
+except ImportError:
+    _HAS_XGB = False
+
+# Optional pyarrow: parquet persists the typed columns in one columnar
+# pass with multithreaded zstd compression instead of the row-by-row
+# text serializer; CSV stays as the fallback
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# LZ4 compresses tree dumps 5-8x at near-memcpy speed; zlib is the
+# always-available fallback
+try:
+    import lz4  # noqa: F401
+    PKL_COMPRESS = ('lz4', 3)
+except ImportError:
+    PKL_COMPRESS = ('zlib', 3)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xgb_boosters import BoosterClassifier, BoosterRegressor  # noqa: E402
+
+
+def _xgb_device():
+    """Run the hist algorithm on the GPU when a CUDA device is visible"""
+    return "cuda" if shutil.which("nvidia-smi") else "cpu"
+
+
+# Classifier and regressor train concurrently (see main), so each fit
+# gets half the machine instead of both claiming every core
+_FIT_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'ml')
@@ -52,67 +101,57 @@ def generate_training_data(n_samples=10000, seed=42):
     - health_status: NORMAL (0), WARNING (1), CRITICAL (2)
     - rul: Remaining Useful Life (cycles)
     """
-    np.random.seed(seed)
-    
-    data = []
-    
-    # Generate data for each health category
-    for _ in range(n_samples):
-        # Randomly select health category based on realistic distribution
-        # Most machines should be normal, fewer warning, least critical
-        category = np.random.choice([0, 1, 2], p=[0.6, 0.25, 0.15])
-        
-        # Generate RUL based on category
-        if category == 0:  # NORMAL
-            rul = np.random.randint(80, 150)  # High RUL
-            # Normal operating conditions
-            temperature = np.random.normal(55, 8)
-            vibration = np.random.normal(2.5, 0.8)
-            current = np.random.normal(12, 2)
-            pressure = np.random.normal(100, 10)
-            runtime_hours = np.random.randint(0, 2000)
-            
-        elif category == 1:  # WARNING
-            rul = np.random.randint(30, 80)  # Medium RUL
-            # Elevated sensor readings
-            temperature = np.random.normal(72, 6)
-            vibration = np.random.normal(5.5, 1.2)
-            current = np.random.normal(18, 3)
-            pressure = np.random.normal(115, 12)
-            runtime_hours = np.random.randint(2000, 5000)
-            
-        else:  # CRITICAL
-            rul = np.random.randint(0, 30)  # Low RUL
-            # Abnormal sensor readings
-            temperature = np.random.normal(88, 8)
-            vibration = np.random.normal(8.5, 1.5)
-            current = np.random.normal(25, 4)
-            pressure = np.random.normal(135, 15)
-            runtime_hours = np.random.randint(5000, 10000)
-        
-        # Add some noise and ensure valid ranges
-        temperature = max(20, min(120, temperature + np.random.normal(0, 2)))
-        vibration = max(0.1, min(15, vibration + np.random.normal(0, 0.3)))
-        current = max(5, min(40, current + np.random.normal(0, 0.5)))
-        pressure = max(50, min(200, pressure + np.random.normal(0, 3)))
-        runtime_hours = max(0, runtime_hours + np.random.randint(-100, 100))
-        rul = max(0, rul + np.random.randint(-5, 5))
-        
-        data.append({
-            'temperature': round(temperature, 2),
-            'vibration': round(vibration, 4),
-            'current': round(current, 4),
-            'pressure': round(pressure, 2),
-            'runtime_hours': runtime_hours,
-            'health_status': category,
-            'rul': rul
-        })
-    
-    df = pd.DataFrame(data)
+    rng = np.random.default_rng(seed)
+
+    # One category array for all samples; per-category distribution
+    # parameters become lookup arrays indexed by it, so every column
+    # below is a single vectorized draw instead of n_samples scalar RNG
+    # calls appending dicts.
+    # Most machines should be normal, fewer warning, least critical
+    cats = rng.choice(3, size=n_samples, p=[0.6, 0.25, 0.15])
+
+    def normal_by_cat(mus, sigmas):
+        """Per-sample normal draw with NORMAL/WARNING/CRITICAL params"""
+        return rng.normal(np.array(mus)[cats], np.array(sigmas)[cats])
+
+    def integers_by_cat(lows, highs):
+        """Per-sample integer draw with NORMAL/WARNING/CRITICAL ranges"""
+        return rng.integers(np.array(lows)[cats], np.array(highs)[cats])
+
+    # RUL: high for NORMAL, medium for WARNING, low for CRITICAL
+    rul = integers_by_cat([80, 30, 0], [150, 80, 30])
+
+    # Sensor readings: normal -> elevated -> abnormal by category
+    temperature = normal_by_cat([55, 72, 88], [8, 6, 8])
+    vibration = normal_by_cat([2.5, 5.5, 8.5], [0.8, 1.2, 1.5])
+    current = normal_by_cat([12, 18, 25], [2, 3, 4])
+    pressure = normal_by_cat([100, 115, 135], [10, 12, 15])
+    runtime_hours = integers_by_cat([0, 2000, 5000], [2000, 5000, 10000])
+
+    # Add some noise and ensure valid ranges
+    temperature = np.clip(temperature + rng.normal(0, 2, n_samples), 20, 120)
+    vibration = np.clip(vibration + rng.normal(0, 0.3, n_samples), 0.1, 15)
+    current = np.clip(current + rng.normal(0, 0.5, n_samples), 5, 40)
+    pressure = np.clip(pressure + rng.normal(0, 3, n_samples), 50, 200)
+    runtime_hours = np.maximum(0, runtime_hours + rng.integers(-100, 100, n_samples))
+    rul = np.maximum(0, rul + rng.integers(-5, 5, n_samples))
+
+    # Narrow dtypes: sensors fit float32 at the rounded resolution and
+    # the integer columns fit int16/int32 - half the bytes moved through
+    # every downstream scan
+    df = pd.DataFrame({
+        'temperature': np.round(temperature, 2).astype(np.float32),
+        'vibration': np.round(vibration, 4).astype(np.float32),
+        'current': np.round(current, 4).astype(np.float32),
+        'pressure': np.round(pressure, 2).astype(np.float32),
+        'runtime_hours': runtime_hours.astype(np.int32),
+        'health_status': cats.astype(np.int8),
+        'rul': rul.astype(np.int16)
+    }, copy=False)  # adopt the arrays; the astype casts above are already fresh copies
     return df
 
 
-def train_classifier(X_train, X_test, y_train, y_test, feature_names):
+def train_classifier(X_train, X_test, y_train, y_test, feature_names, ref_dm=None):
     """
     Train Gradient Boosting Classifier for health status prediction.
     """
@@ -120,18 +159,54 @@ def train_classifier(X_train, X_test, y_train, y_test, feature_names):
     print("Training Gradient Boosting Classifier for Health Status")
     print("="*60)
     
-    # GradientBoosting parameters optimized for multi-class classification
-    classifier = GradientBoostingClassifier(
-        n_estimators=150,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        random_state=42,
-        verbose=0
-    )
-    
-    # Train
-    classifier.fit(X_train, y_train)
+    if _HAS_XGB:
+        # Raw xgb.train over QuantileDMatrix: the quantile sketch of X is
+        # the expensive part of hist training, and ref_dm (built once in
+        # main) lets classifier and regressor share it instead of each
+        # re-sketching the same matrix
+        xgb_params = {
+            "objective": "multi:softprob",
+            "num_class": 3,
+            "max_depth": 6,
+            "learning_rate": 0.1,
+            "subsample": 0.8,
+            "tree_method": "hist",
+            "device": _xgb_device(),
+            "nthread": _FIT_JOBS,
+            "seed": 42,
+        }
+    else:
+        # Histogram boosting: pre-bins features once and parallelizes
+        # the per-feature histogram build via OpenMP - same API, an
+        # order of magnitude faster than exact-greedy GradientBoosting
+        classifier = HistGradientBoostingClassifier(
+            max_iter=150,
+            max_depth=6,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            tol=1e-4,
+            random_state=42
+        )
+
+    # A 10% validation slice drives early stopping: boosting halts once
+    # held-out loss stops improving instead of always running 150 rounds
+    if _HAS_XGB:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.1, random_state=42, stratify=y_train
+        )
+        dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit, ref=ref_dm)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=ref_dm)
+        booster = xgb.train(
+            xgb_params, dtrain, num_boost_round=150,
+            evals=[(dval, "validation")], early_stopping_rounds=15,
+            verbose_eval=False
+        )
+        classifier = BoosterClassifier(booster)
+    else:
+        # HistGB holds out validation_fraction internally
+        classifier.fit(X_train, y_train)
     
     # Predictions
     y_pred = classifier.predict(X_test)
@@ -156,22 +231,31 @@ def train_classifier(X_train, X_test, y_train, y_test, feature_names):
     print(f"\nConfusion Matrix:")
     print(confusion_matrix(y_test, y_pred))
     
-    # Feature importance
-    print(f"\nFeature Importance:")
-    importance = classifier.feature_importances_
-    for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
-        print(f"  {name}: {imp:.4f}")
-    
+    # Feature importance (hist boosting exposes no impurity importances)
+    importance = getattr(classifier, 'feature_importances_', None)
+    if importance is not None:
+        print(f"\nFeature Importance:")
+        for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
+            print(f"  {name}: {imp:.4f}")
+
+    # Rounds actually kept: XGBoost exposes best_iteration, HistGB n_iter_
+    best_iteration = getattr(classifier, 'best_iteration',
+                             getattr(classifier, 'n_iter_', None))
+
     return classifier, {
         'accuracy': accuracy,
+        'best_iteration': best_iteration,
         'precision': precision,
         'recall': recall,
         'f1_score': f1,
-        'feature_importance': dict(zip(feature_names, importance.tolist()))
+        'feature_importance': (
+            dict(zip(feature_names, importance.tolist()))
+            if importance is not None else {}
+        )
     }
 
 
-def train_regressor(X_train, X_test, y_train, y_test, feature_names):
+def train_regressor(X_train, X_test, y_train, y_test, feature_names, ref_dm=None):
     """
     Train Gradient Boosting Regressor for RUL prediction.
     """
@@ -179,18 +263,46 @@ def train_regressor(X_train, X_test, y_train, y_test, feature_names):
     print("Training Gradient Boosting Regressor for RUL Prediction")
     print("="*60)
     
-    # GradientBoosting parameters for regression
-    regressor = GradientBoostingRegressor(
-        n_estimators=150,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        random_state=42,
-        verbose=0
-    )
-    
-    # Train
-    regressor.fit(X_train, y_train)
+    if _HAS_XGB:
+        # Same shared-sketch arrangement as the classifier
+        xgb_params = {
+            "objective": "reg:squarederror",
+            "max_depth": 6,
+            "learning_rate": 0.1,
+            "subsample": 0.8,
+            "tree_method": "hist",
+            "device": _xgb_device(),
+            "nthread": _FIT_JOBS,
+            "seed": 42,
+        }
+    else:
+        # Same binned-histogram speedup as the classifier above
+        regressor = HistGradientBoostingRegressor(
+            max_iter=150,
+            max_depth=6,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            tol=1e-4,
+            random_state=42
+        )
+
+    # Same early-stopping arrangement as the classifier
+    if _HAS_XGB:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.1, random_state=42
+        )
+        dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit, ref=ref_dm)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=ref_dm)
+        booster = xgb.train(
+            xgb_params, dtrain, num_boost_round=150,
+            evals=[(dval, "validation")], early_stopping_rounds=15,
+            verbose_eval=False
+        )
+        regressor = BoosterRegressor(booster)
+    else:
+        regressor.fit(X_train, y_train)
     
     # Predictions
     y_pred = regressor.predict(X_test)
@@ -205,47 +317,57 @@ def train_regressor(X_train, X_test, y_train, y_test, feature_names):
     print(f"  RMSE: {rmse:.4f} cycles")
     print(f"  R²:   {r2:.4f}")
     
-    # Feature importance
-    print(f"\nFeature Importance:")
-    importance = regressor.feature_importances_
-    for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
-        print(f"  {name}: {imp:.4f}")
-    
+    # Feature importance (hist boosting exposes no impurity importances)
+    importance = getattr(regressor, 'feature_importances_', None)
+    if importance is not None:
+        print(f"\nFeature Importance:")
+        for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
+            print(f"  {name}: {imp:.4f}")
+
+    best_iteration = getattr(regressor, 'best_iteration',
+                             getattr(regressor, 'n_iter_', None))
+
     return regressor, {
         'mae': mae,
+        'best_iteration': best_iteration,
         'rmse': rmse,
         'r2_score': r2,
-        'feature_importance': dict(zip(feature_names, importance.tolist()))
+        'feature_importance': (
+            dict(zip(feature_names, importance.tolist()))
+            if importance is not None else {}
+        )
     }
 
 
-def save_models(classifier, regressor, scaler, classifier_metrics, regressor_metrics, feature_names):
+def save_models(classifier, regressor, classifier_metrics, regressor_metrics, feature_names):
     """
     Save trained models and metadata.
     """
     print("\n" + "="*60)
     print("Saving Models")
     print("="*60)
-    
+
     # Save classifier
     classifier_path = os.path.join(ML_DIR, 'health_classifier.pkl')
-    joblib.dump(classifier, classifier_path)
+    joblib.dump(classifier, classifier_path, compress=PKL_COMPRESS, protocol=5)
     print(f"  Classifier saved: {classifier_path}")
-    
+
     # Save regressor
     regressor_path = os.path.join(ML_DIR, 'rul_regressor.pkl')
-    joblib.dump(regressor, regressor_path)
+    joblib.dump(regressor, regressor_path, compress=PKL_COMPRESS, protocol=5)
     print(f"  Regressor saved: {regressor_path}")
-    
-    # Save scaler
+
+    # These models consume raw features - remove any stale scaler so the
+    # serving path doesn't apply an old transform to them
     scaler_path = os.path.join(ML_DIR, 'feature_scaler.pkl')
-    joblib.dump(scaler, scaler_path)
-    print(f"  Scaler saved: {scaler_path}")
+    if os.path.exists(scaler_path):
+        os.remove(scaler_path)
+        print(f"  Stale scaler removed: {scaler_path}")
     
     # Save metadata
     metadata = {
         'model_version': '2.0',
-        'algorithm': 'GradientBoosting',
+        'algorithm': 'XGBoost' if _HAS_XGB else 'GradientBoosting',
         'training_date': datetime.now().isoformat(),
         'feature_names': feature_names,
         'label_encoding': {
@@ -277,12 +399,17 @@ def main():
     print(f"Training started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Generate training data
-    print("\n[1/5] Generating training data...")
+    print("\n[1/4] Generating training data...")
     df = generate_training_data(n_samples=15000)
     
     # Save training data
-    data_path = os.path.join(DATA_DIR, 'training_data.csv')
-    df.to_csv(data_path, index=False)
+    if _HAS_PYARROW:
+        data_path = os.path.join(DATA_DIR, 'training_data.parquet')
+        df.to_parquet(data_path, engine='pyarrow',
+                      compression='zstd', compression_level=3)
+    else:
+        data_path = os.path.join(DATA_DIR, 'training_data.csv')
+        df.to_csv(data_path, index=False)
     print(f"  Training data saved: {data_path}")
     print(f"  Total samples: {len(df)}")
     print(f"  Class distribution:")
@@ -291,40 +418,57 @@ def main():
     print(f"    CRITICAL: {(df['health_status'] == 2).sum()} ({(df['health_status'] == 2).mean():.1%})")
     
     # Prepare features and labels
-    print("\n[2/5] Preparing features...")
+    print("\n[2/4] Preparing features...")
     feature_names = ['temperature', 'vibration', 'current', 'pressure', 'runtime_hours']
-    X = df[feature_names].values
+    # float32 matches the boosters' internal dtype and halves the
+    # footprint of the training matrix
+    X = df[feature_names].to_numpy(dtype=np.float32)
     y_status = df['health_status'].values
     y_rul = df['rul'].values
     
-    # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Split data
-    X_train, X_test, y_status_train, y_status_test, y_rul_train, y_rul_test = train_test_split(
-        X_scaled, y_status, y_rul, test_size=0.2, random_state=42, stratify=y_status
-    )
+    # No scaling: boosted trees are invariant to monotonic per-feature
+    # transforms, so standardization changes no split decision - it only
+    # cost a full pass plus a copy of X here and a scaler.transform on
+    # every request at inference
+
+    # Split indices once, then gather each array directly. The 3-array
+    # train_test_split form routes X, y_status and y_rul through sklearn's
+    # indexable()/safe_indexing wrappers per array; taking the stratified
+    # index pair ourselves keeps it to one permutation and three plain
+    # numpy takes per side.
+    splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    train_idx, test_idx = next(splitter.split(X, y_status))
+    X_train, X_test = X[train_idx], X[test_idx]
+    y_status_train, y_status_test = y_status[train_idx], y_status[test_idx]
+    y_rul_train, y_rul_test = y_rul[train_idx], y_rul[test_idx]
     
     print(f"  Training set: {len(X_train)} samples")
     print(f"  Test set: {len(X_test)} samples")
     
-    # Train classifier
-    print("\n[3/5] Training classifier...")
-    classifier, classifier_metrics = train_classifier(
-        X_train, X_test, y_status_train, y_status_test, feature_names
-    )
-    
-    # Train regressor
-    print("\n[4/5] Training regressor...")
-    regressor, regressor_metrics = train_regressor(
-        X_train, X_test, y_rul_train, y_rul_test, feature_names
-    )
+    # Train both models concurrently: they are independent fits over the
+    # same split, and the boosters release the GIL in their native fit
+    # loops, so two threads genuinely overlap. Inner parallelism is
+    # capped at _FIT_JOBS to keep the pair from oversubscribing cores.
+    print("\n[3/4] Training classifier and regressor concurrently...")
+    # One quantile sketch of the training features, shared by both fits
+    # via QuantileDMatrix(ref=...) so X is binned once, not per model
+    ref_dm = xgb.QuantileDMatrix(X_train) if _HAS_XGB else None
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        classifier_future = pool.submit(
+            train_classifier,
+            X_train, X_test, y_status_train, y_status_test, feature_names, ref_dm
+        )
+        regressor_future = pool.submit(
+            train_regressor,
+            X_train, X_test, y_rul_train, y_rul_test, feature_names, ref_dm
+        )
+        classifier, classifier_metrics = classifier_future.result()
+        regressor, regressor_metrics = regressor_future.result()
     
     # Save models
-    print("\n[5/5] Saving models...")
+    print("\n[4/4] Saving models...")
     metadata = save_models(
-        classifier, regressor, scaler,
+        classifier, regressor,
         classifier_metrics, regressor_metrics, feature_names
     )
     
@@ -332,15 +476,15 @@ def main():
     print("Training Complete!")
     print("="*60)
     print(f"\nModel Summary:")
-    print(f"  Algorithm: GradientBoosting")
+    print(f"  Algorithm: {metadata['algorithm']}")
     print(f"  Version: {metadata['model_version']}")
     print(f"  Classifier Accuracy: {classifier_metrics['accuracy']:.4f}")
     print(f"  Classifier F1-Score: {classifier_metrics['f1_score']:.4f}")
     print(f"  Regressor MAE: {regressor_metrics['mae']:.2f} cycles")
     print(f"  Regressor R²: {regressor_metrics['r2_score']:.4f}")
     print(f"\nModels saved to: {ML_DIR}")
-    
-    return classifier, regressor, scaler, metadata
+
+    return classifier, regressor, metadata
 
 
 if __name__ == "__main__":
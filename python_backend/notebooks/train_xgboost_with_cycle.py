@@ -14,9 +14,12 @@ Target: RUL (Remaining Useful Life in cycles)
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import (
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor
+)
+from sklearn.model_selection import (
+    train_test_split, cross_val_score, StratifiedShuffleSplit
+)
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     classification_report, confusion_matrix,
@@ -25,8 +28,92 @@ from sklearn.metrics import (
 import joblib
 import json
 import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Optional XGBoost: its hist tree method bins features into <=256
+# integer buckets so split search scans bins instead of sorted values,
+# and it parallelizes across cores (or a GPU). Guarded so the sklearn
+# GradientBoosting path below keeps working where it isn't installed.
+try:
+    import xgboost as xgb
+    _HAS_XGB = True
+except ImportError:
+    _HAS_XGB = False
+
+# Optional pyarrow: parquet persists the typed columns in one columnar
+# pass with multithreaded zstd compression instead of the row-by-row
+# text serializer; CSV stays as the fallback
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# LZ4 compresses tree dumps 5-8x at near-memcpy speed; zlib is the
+# always-available fallback
+try:
+    import lz4  # noqa: F401
+    PKL_COMPRESS = ('lz4', 3)
+except ImportError:
+    PKL_COMPRESS = ('zlib', 3)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xgb_boosters import BoosterClassifier, BoosterRegressor  # noqa: E402
+
+
+def _xgb_device():
+    """Run the hist algorithm on the GPU when a CUDA device is visible"""
+    return "cuda" if shutil.which("nvidia-smi") else "cpu"
+
+
+# Classifier and regressor train concurrently (see main), so each fit
+# gets half the machine instead of both claiming every core
+_FIT_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+
+# Optional numba JIT, same guard as the backend's ml_model: when absent
+# the synthesis falls back to the vectorized numpy path below
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _degrade_kernel(cycle_norm, noise, base, power, scale, sigma, lo, hi, out):
+    """Fused base*(1 + norm**power*scale) + noise*sigma then clamp"""
+    for i in prange(cycle_norm.shape[0]):
+        v = base * (1.0 + cycle_norm[i] ** power * scale) + noise[i] * sigma
+        out[i] = min(max(v, lo), hi)
+
+
+def _degrade(cycle_norm, noise, base, power, scale, sigma, lo, hi):
+    """
+    Build one degraded sensor channel. With numba the factor, noise and
+    bounds run as a single parallel loop - one memory sweep instead of a
+    temporary per op; otherwise one vectorized expression with
+    np.clip(out=) keeps it to a single materialized intermediate.
+    """
+    out = np.empty_like(cycle_norm)
+    if _HAS_NUMBA:
+        _degrade_kernel(cycle_norm, noise, base, power, scale, sigma, lo, hi, out)
+    else:
+        np.clip(base * (1.0 + cycle_norm ** power * scale) + noise * sigma,
+                lo, hi, out=out)
+    return out
+
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'ml')
@@ -53,101 +140,115 @@ def generate_training_data_with_cycles(n_samples=15000, n_engines=100, seed=42):
     
     NO DATA LEAKAGE: RUL is calculated from known failure cycle, not max cycle in dataset.
     """
-    np.random.seed(seed)
-    
-    data = []
-    
-    # Generate data for multiple engines
-    for engine_id in range(1, n_engines + 1):
-        # Each engine has a random failure cycle (between 80 and 150)
-        failure_cycle = np.random.randint(80, MAX_CYCLE + 1)
-        
-        # Generate cycles for this engine (from 1 to failure_cycle)
-        # Sample more cycles near failure (important for learning degradation)
-        cycles = []
-        for _ in range(n_samples // n_engines):
-            # Weight sampling towards later cycles (more degradation examples)
-            cycle = int(np.random.beta(2, 1) * failure_cycle) + 1
-            cycle = min(cycle, failure_cycle)
-            cycles.append(cycle)
-        
-        for cycle in cycles:
-            # Calculate RUL (ground truth - no leakage)
-            rul = failure_cycle - cycle
-            rul = max(0, rul)  # RUL cannot be negative
-            
-            # Normalize cycle for degradation modeling
-            cycle_norm = cycle / failure_cycle  # 0 to 1
-            
-            # Model sensor degradation over cycles
-            # Base values (healthy state)
-            base_temp = 50.0
-            base_vib = 2.0
-            base_curr = 10.0
-            base_pressure = 100.0
-            
-            # Degradation factors (non-linear, realistic patterns)
-            # Temperature increases with wear
-            temp_factor = 1 + (cycle_norm ** 1.5) * 0.7
-            # Vibration increases quadratically (mechanical wear accelerates)
-            vib_factor = 1 + (cycle_norm ** 2.0) * 1.5
-            # Current increases (electrical degradation)
-            curr_factor = 1 + (cycle_norm ** 1.3) * 0.9
-            # Pressure may increase or decrease (system dependent)
-            pressure_factor = 1 + (cycle_norm ** 1.0) * 0.3
-            
-            # Calculate sensor values
-            temperature = base_temp * temp_factor + np.random.normal(0, 3)
-            vibration = base_vib * vib_factor + np.random.normal(0, 0.4)
-            current = base_curr * curr_factor + np.random.normal(0, 0.8)
-            pressure = base_pressure * pressure_factor + np.random.normal(0, 5)
-            
-            # Ensure realistic bounds
-            temperature = np.clip(temperature, 20, 120)
-            vibration = np.clip(vibration, 0.1, 15)
-            current = np.clip(current, 5, 40)
-            pressure = np.clip(pressure, 50, 200)
-            
-            # Determine health status based on RUL
-            if rul > 80:
-                health_status = 0  # NORMAL
-            elif rul >= 30:
-                health_status = 1  # WARNING
-            else:
-                health_status = 2  # CRITICAL
-            
-            data.append({
-                'engine_id': engine_id,
-                'cycle': cycle,
-                'temperature': round(temperature, 2),
-                'vibration': round(vibration, 4),
-                'current': round(current, 2),
-                'pressure': round(pressure, 2),
-                'rul': rul,
-                'health_status': health_status,
-                'failure_cycle': failure_cycle  # For validation only, not used in training
-            })
-    
-    df = pd.DataFrame(data)
+    rng = np.random.default_rng(seed)
+
+    per_engine = n_samples // n_engines
+
+    # Each engine has a random failure cycle (between 80 and 150)
+    failure_cycles = rng.integers(80, MAX_CYCLE + 1, size=n_engines)
+
+    # Sample cycles for every engine in one (n_engines, per_engine) draw;
+    # beta(2, 1) weights sampling towards later cycles (more degradation
+    # examples)
+    cycles = (rng.beta(2, 1, size=(n_engines, per_engine))
+              * failure_cycles[:, None]).astype(np.int64) + 1
+    cycles = np.minimum(cycles, failure_cycles[:, None]).ravel()
+
+    engine_ids = np.repeat(np.arange(1, n_engines + 1), per_engine)
+    failure_per_row = np.repeat(failure_cycles, per_engine)
+
+    # Calculate RUL (ground truth from known failure cycle - no leakage)
+    rul = np.maximum(0, failure_per_row - cycles)
+
+    # Normalize cycle for degradation modeling (0 to 1)
+    cycle_norm = cycles / failure_per_row
+
+    # Sensor values from healthy-state baselines via the fused kernel.
+    # Degradation patterns (power/scale per channel): temperature rises
+    # with wear, vibration accelerates quadratically, current reflects
+    # electrical degradation, pressure drifts mildly. One standard-normal
+    # draw covers all four channels' noise.
+    n_rows = cycles.size
+    noise = rng.normal(size=(4, n_rows))
+    temperature = _degrade(cycle_norm, noise[0], 50.0, 1.5, 0.7, 3.0, 20.0, 120.0)
+    vibration = _degrade(cycle_norm, noise[1], 2.0, 2.0, 1.5, 0.4, 0.1, 15.0)
+    current = _degrade(cycle_norm, noise[2], 10.0, 1.3, 0.9, 0.8, 5.0, 40.0)
+    pressure = _degrade(cycle_norm, noise[3], 100.0, 1.0, 0.3, 5.0, 50.0, 200.0)
+
+    # Health status from RUL: NORMAL > 80, WARNING >= 30, else CRITICAL
+    health_status = np.select([rul > 80, rul >= 30], [0, 1], default=2)
+
+    # Narrow dtypes: sensors fit float32 at the rounded resolution and
+    # cycles/RUL/ids fit int16 - half the bytes moved through every
+    # downstream scan
+    df = pd.DataFrame({
+        'engine_id': engine_ids.astype(np.int16),
+        'cycle': cycles.astype(np.int16),
+        'temperature': np.round(temperature, 2).astype(np.float32),
+        'vibration': np.round(vibration, 4).astype(np.float32),
+        'current': np.round(current, 2).astype(np.float32),
+        'pressure': np.round(pressure, 2).astype(np.float32),
+        'rul': rul.astype(np.int16),
+        'health_status': health_status.astype(np.int8),
+        'failure_cycle': failure_per_row.astype(np.int16)  # For validation only, not used in training
+    }, copy=False)  # adopt the arrays; the astype casts above are already fresh copies
     return df
 
 
-def train_classifier(X_train, X_test, y_train, y_test, feature_names):
+def train_classifier(X_train, X_test, y_train, y_test, feature_names, ref_dm=None):
     """Train Gradient Boosting Classifier for health status prediction."""
     print("\n" + "="*60)
     print("Training Gradient Boosting Classifier for Health Status")
     print("="*60)
     
-    classifier = GradientBoostingClassifier(
-        n_estimators=150,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        random_state=42,
-        verbose=0
-    )
-    
-    classifier.fit(X_train, y_train)
+    if _HAS_XGB:
+        # Raw xgb.train over QuantileDMatrix: the quantile sketch of X is
+        # the expensive part of hist training, and ref_dm (built once in
+        # main) lets classifier and regressor share it instead of each
+        # re-sketching the same matrix
+        xgb_params = {
+            "objective": "multi:softprob",
+            "num_class": 3,
+            "max_depth": 6,
+            "learning_rate": 0.1,
+            "subsample": 0.8,
+            "tree_method": "hist",
+            "device": _xgb_device(),
+            "nthread": _FIT_JOBS,
+            "seed": 42,
+        }
+    else:
+        # Histogram boosting: pre-bins features once and parallelizes
+        # the per-feature histogram build via OpenMP - same API, an
+        # order of magnitude faster than exact-greedy GradientBoosting
+        classifier = HistGradientBoostingClassifier(
+            max_iter=150,
+            max_depth=6,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            tol=1e-4,
+            random_state=42
+        )
+
+    # A 10% validation slice drives early stopping: boosting halts once
+    # held-out loss stops improving instead of always running 150 rounds
+    if _HAS_XGB:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.1, random_state=42, stratify=y_train
+        )
+        dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit, ref=ref_dm)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=ref_dm)
+        booster = xgb.train(
+            xgb_params, dtrain, num_boost_round=150,
+            evals=[(dval, "validation")], early_stopping_rounds=15,
+            verbose_eval=False
+        )
+        classifier = BoosterClassifier(booster)
+    else:
+        # HistGB holds out validation_fraction internally
+        classifier.fit(X_train, y_train)
     
     y_pred = classifier.predict(X_test)
     y_prob = classifier.predict_proba(X_test)
@@ -167,21 +268,31 @@ def train_classifier(X_train, X_test, y_train, y_test, feature_names):
     labels = ['NORMAL', 'WARNING', 'CRITICAL']
     print(classification_report(y_test, y_pred, target_names=labels))
     
-    print(f"\nFeature Importance:")
-    importance = classifier.feature_importances_
-    for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
-        print(f"  {name}: {imp:.4f}")
-    
+    # Feature importance (hist boosting exposes no impurity importances)
+    importance = getattr(classifier, 'feature_importances_', None)
+    if importance is not None:
+        print(f"\nFeature Importance:")
+        for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
+            print(f"  {name}: {imp:.4f}")
+
+    # Rounds actually kept: XGBoost exposes best_iteration, HistGB n_iter_
+    best_iteration = getattr(classifier, 'best_iteration',
+                             getattr(classifier, 'n_iter_', None))
+
     return classifier, {
         'accuracy': accuracy,
+        'best_iteration': best_iteration,
         'precision': precision,
         'recall': recall,
         'f1_score': f1,
-        'feature_importance': dict(zip(feature_names, importance.tolist()))
+        'feature_importance': (
+            dict(zip(feature_names, importance.tolist()))
+            if importance is not None else {}
+        )
     }
 
 
-def train_regressor(X_train, X_test, y_train, y_test, feature_names):
+def train_regressor(X_train, X_test, y_train, y_test, feature_names, ref_dm=None):
     """
     Train Gradient Boosting Regressor for RUL prediction.
     
@@ -192,16 +303,46 @@ def train_regressor(X_train, X_test, y_train, y_test, feature_names):
     print("Training Gradient Boosting Regressor for RUL Prediction")
     print("="*60)
     
-    regressor = GradientBoostingRegressor(
-        n_estimators=150,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        random_state=42,
-        verbose=0
-    )
-    
-    regressor.fit(X_train, y_train)
+    if _HAS_XGB:
+        # Same shared-sketch arrangement as the classifier
+        xgb_params = {
+            "objective": "reg:squarederror",
+            "max_depth": 6,
+            "learning_rate": 0.1,
+            "subsample": 0.8,
+            "tree_method": "hist",
+            "device": _xgb_device(),
+            "nthread": _FIT_JOBS,
+            "seed": 42,
+        }
+    else:
+        # Same binned-histogram speedup as the classifier above
+        regressor = HistGradientBoostingRegressor(
+            max_iter=150,
+            max_depth=6,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            tol=1e-4,
+            random_state=42
+        )
+
+    # Same early-stopping arrangement as the classifier
+    if _HAS_XGB:
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.1, random_state=42
+        )
+        dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit, ref=ref_dm)
+        dval = xgb.QuantileDMatrix(X_val, label=y_val, ref=ref_dm)
+        booster = xgb.train(
+            xgb_params, dtrain, num_boost_round=150,
+            evals=[(dval, "validation")], early_stopping_rounds=15,
+            verbose_eval=False
+        )
+        regressor = BoosterRegressor(booster)
+    else:
+        regressor.fit(X_train, y_train)
     
     y_pred = regressor.predict(X_test)
     
@@ -214,50 +355,62 @@ def train_regressor(X_train, X_test, y_train, y_test, feature_names):
     print(f"  RMSE: {rmse:.4f} cycles")
     print(f"  R²:   {r2:.4f}")
     
-    print(f"\nFeature Importance:")
-    importance = regressor.feature_importances_
-    for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
-        print(f"  {name}: {imp:.4f}")
-    
-    # Check for monotonicity in cycle feature
-    print(f"\nMonotonicity Check (Cycle feature):")
-    cycle_idx = feature_names.index('cycle')
-    cycle_importance = importance[cycle_idx]
-    print(f"  Cycle importance: {cycle_importance:.4f}")
-    if cycle_importance > 0.1:
-        print(f"  ✓ Cycle feature has significant importance")
-    else:
-        print(f"  ⚠️  Cycle feature has low importance - may need more training data")
-    
+    # Feature importance (hist boosting exposes no impurity importances)
+    importance = getattr(regressor, 'feature_importances_', None)
+    if importance is not None:
+        print(f"\nFeature Importance:")
+        for name, imp in sorted(zip(feature_names, importance), key=lambda x: x[1], reverse=True):
+            print(f"  {name}: {imp:.4f}")
+
+        # Check for monotonicity in cycle feature
+        print(f"\nMonotonicity Check (Cycle feature):")
+        cycle_idx = feature_names.index('cycle')
+        cycle_importance = importance[cycle_idx]
+        print(f"  Cycle importance: {cycle_importance:.4f}")
+        if cycle_importance > 0.1:
+            print(f"  ✓ Cycle feature has significant importance")
+        else:
+            print(f"  ⚠️  Cycle feature has low importance - may need more training data")
+
+    best_iteration = getattr(regressor, 'best_iteration',
+                             getattr(regressor, 'n_iter_', None))
+
     return regressor, {
         'mae': mae,
+        'best_iteration': best_iteration,
         'rmse': rmse,
         'r2_score': r2,
-        'feature_importance': dict(zip(feature_names, importance.tolist()))
+        'feature_importance': (
+            dict(zip(feature_names, importance.tolist()))
+            if importance is not None else {}
+        )
     }
 
 
-def save_models(classifier, regressor, scaler, classifier_metrics, regressor_metrics, feature_names):
+def save_models(classifier, regressor, classifier_metrics, regressor_metrics, feature_names):
     """Save trained models and metadata."""
     print("\n" + "="*60)
     print("Saving Models")
     print("="*60)
     
     classifier_path = os.path.join(ML_DIR, 'health_classifier.pkl')
-    joblib.dump(classifier, classifier_path)
+    joblib.dump(classifier, classifier_path, compress=PKL_COMPRESS, protocol=5)
     print(f"  Classifier saved: {classifier_path}")
     
     regressor_path = os.path.join(ML_DIR, 'rul_regressor.pkl')
-    joblib.dump(regressor, regressor_path)
+    joblib.dump(regressor, regressor_path, compress=PKL_COMPRESS, protocol=5)
     print(f"  Regressor saved: {regressor_path}")
     
+    # These models consume raw features - remove any stale scaler so the
+    # serving path doesn't apply an old transform to them
     scaler_path = os.path.join(ML_DIR, 'feature_scaler.pkl')
-    joblib.dump(scaler, scaler_path)
-    print(f"  Scaler saved: {scaler_path}")
-    
+    if os.path.exists(scaler_path):
+        os.remove(scaler_path)
+        print(f"  Stale scaler removed: {scaler_path}")
+
     metadata = {
         'model_version': '2.1',
-        'algorithm': 'GradientBoosting',
+        'algorithm': 'XGBoost' if _HAS_XGB else 'GradientBoosting',
         'training_date': datetime.now().isoformat(),
         'feature_names': feature_names,
         'initial_rul': INITIAL_RUL,
@@ -301,12 +454,17 @@ def main():
     print(f"Training started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Generate training data
-    print("\n[1/5] Generating training data with proper degradation...")
+    print("\n[1/4] Generating training data with proper degradation...")
     df = generate_training_data_with_cycles(n_samples=15000, n_engines=100)
     
     # Save training data
-    data_path = os.path.join(DATA_DIR, 'training_data_with_cycles.csv')
-    df.to_csv(data_path, index=False)
+    if _HAS_PYARROW:
+        data_path = os.path.join(DATA_DIR, 'training_data_with_cycles.parquet')
+        df.to_parquet(data_path, engine='pyarrow',
+                      compression='zstd', compression_level=3)
+    else:
+        data_path = os.path.join(DATA_DIR, 'training_data_with_cycles.csv')
+        df.to_csv(data_path, index=False)
     print(f"  Training data saved: {data_path}")
     print(f"  Total samples: {len(df)}")
     print(f"  Engines: {df['engine_id'].nunique()}")
@@ -318,41 +476,63 @@ def main():
     print(f"    CRITICAL: {(df['health_status'] == 2).sum()} ({(df['health_status'] == 2).mean():.1%})")
     
     # Prepare features and labels
-    print("\n[2/5] Preparing features...")
+    print("\n[2/4] Preparing features...")
+    # All features are numeric. If a categorical ever joins this list
+    # (engine_id, machine_type), do NOT one-hot it: mark the column
+    # .astype('category') and pass enable_categorical=True to the XGBoost
+    # estimator - the hist method then partitions category bins natively,
+    # keeping one column where one-hot would add k and scan them all.
     feature_names = ['temperature', 'vibration', 'current', 'pressure', 'cycle']
-    X = df[feature_names].values
+    # float32 matches the boosters' internal dtype and halves the
+    # footprint of the training matrix
+    X = df[feature_names].to_numpy(dtype=np.float32)
     y_status = df['health_status'].values
     y_rul = df['rul'].values
     
-    # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Split data
-    X_train, X_test, y_status_train, y_status_test, y_rul_train, y_rul_test = train_test_split(
-        X_scaled, y_status, y_rul, test_size=0.2, random_state=42, stratify=y_status
-    )
+    # No scaling: boosted trees are invariant to monotonic per-feature
+    # transforms, so standardization changes no split decision - it only
+    # cost a full pass plus a copy of X here and a scaler.transform on
+    # every request at inference
+
+    # Split indices once, then gather each array directly. The 3-array
+    # train_test_split form routes X, y_status and y_rul through sklearn's
+    # indexable()/safe_indexing wrappers per array; taking the stratified
+    # index pair ourselves keeps it to one permutation and three plain
+    # numpy takes per side.
+    splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    train_idx, test_idx = next(splitter.split(X, y_status))
+    X_train, X_test = X[train_idx], X[test_idx]
+    y_status_train, y_status_test = y_status[train_idx], y_status[test_idx]
+    y_rul_train, y_rul_test = y_rul[train_idx], y_rul[test_idx]
     
     print(f"  Training set: {len(X_train)} samples")
     print(f"  Test set: {len(X_test)} samples")
     print(f"  Features: {feature_names}")
     
-    # Train classifier
-    print("\n[3/5] Training classifier...")
-    classifier, classifier_metrics = train_classifier(
-        X_train, X_test, y_status_train, y_status_test, feature_names
-    )
-    
-    # Train regressor
-    print("\n[4/5] Training regressor...")
-    regressor, regressor_metrics = train_regressor(
-        X_train, X_test, y_rul_train, y_rul_test, feature_names
-    )
+    # Train both models concurrently: they are independent fits over the
+    # same split, and the boosters release the GIL in their native fit
+    # loops, so two threads genuinely overlap. Inner parallelism is
+    # capped at _FIT_JOBS to keep the pair from oversubscribing cores.
+    print("\n[3/4] Training classifier and regressor concurrently...")
+    # One quantile sketch of the training features, shared by both fits
+    # via QuantileDMatrix(ref=...) so X is binned once, not per model
+    ref_dm = xgb.QuantileDMatrix(X_train) if _HAS_XGB else None
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        classifier_future = pool.submit(
+            train_classifier,
+            X_train, X_test, y_status_train, y_status_test, feature_names, ref_dm
+        )
+        regressor_future = pool.submit(
+            train_regressor,
+            X_train, X_test, y_rul_train, y_rul_test, feature_names, ref_dm
+        )
+        classifier, classifier_metrics = classifier_future.result()
+        regressor, regressor_metrics = regressor_future.result()
     
     # Save models
-    print("\n[5/5] Saving models...")
+    print("\n[4/4] Saving models...")
     metadata = save_models(
-        classifier, regressor, scaler,
+        classifier, regressor,
         classifier_metrics, regressor_metrics, feature_names
     )
     
@@ -360,7 +540,7 @@ def main():
     print("Training Complete!")
     print("="*60)
     print(f"\nModel Summary:")
-    print(f"  Algorithm: GradientBoosting")
+    print(f"  Algorithm: {metadata['algorithm']}")
     print(f"  Version: {metadata['model_version']}")
     print(f"  Features: {', '.join(feature_names)}")
     print(f"  Initial RUL: {INITIAL_RUL} cycles")
@@ -373,7 +553,7 @@ def main():
     print(f"  1. Run validation: python validate_degradation.py")
     print(f"  2. Update predict_health() to accept cycle parameter")
     
-    return classifier, regressor, scaler, metadata
+    return classifier, regressor, metadata
 
 
 if __name__ == "__main__":
@@ -22,7 +22,7 @@ from schemas import (
     AuthResponse, MessageResponse
 )
 from auth import (
-    hash_password, verify_password, validate_password_strength,
+    hash_password_async, verify_password_async, validate_password_strength,
     create_access_token, create_refresh_token, decode_token,
     create_email_verification_token, verify_email_token,
     generate_mfa_secret, verify_otp, generate_mfa_qr_code,
@@ -141,9 +141,10 @@ async def signup(request: SignUpRequest, db: AsyncSession = Depends(get_db)):
     
     # Create user (auto-verify in development mode)
     is_dev = settings.APP_ENV == "development"
+    password_hash = await hash_password_async(request.password)
     user = User(
         email=request.email.lower(),
-        password_hash=hash_password(request.password),
+        password_hash=password_hash,
         full_name=request.full_name,
         auth_provider="email",
         email_verification_token=verification_token,
@@ -287,7 +288,7 @@ async def login(
         )
     
     # Verify password
-    if not user.password_hash or not verify_password(request.password, user.password_hash):
+    if not user.password_hash or not await verify_password_async(request.password, user.password_hash):
         attempt.failure_reason = "invalid_password"
         db.add(attempt)
         await db.commit()
@@ -599,7 +600,7 @@ async def disable_mfa(
         )
     
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid password"
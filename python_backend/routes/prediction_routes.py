@@ -51,37 +51,16 @@ async def make_prediction(
     - risk_level: low/warning/critical
     - root_cause: Explanation of potential issues
     """
-    # Enhanced input validation and sanitization
-    from input_validation import validate_sensor_input
-    
+    # Inputs are already validated (and clamped) by PredictionRequest's
+    # model_validator, so the fields go straight to the predictor
     try:
-        temperature, vibration, current, pressure, runtime_hours, cycle = validate_sensor_input(
+        result = predict_health(
             temperature=request.temperature,
             vibration=request.vibration,
             current=request.current,
-            pressure=getattr(request, 'pressure', 100.0) or 100.0,
-            runtime_hours=getattr(request, 'runtime_hours', 0) or 0,
-            cycle=getattr(request, 'cycle', None),
-            strict=False  # Clamp instead of error for production resilience
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Input validation error: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Invalid sensor input values"
-        )
-    
-    # Run prediction with validated inputs
-    try:
-        result = predict_health(
-            temperature=temperature,
-            vibration=vibration,
-            current=current,
-            pressure=pressure,
-            runtime_hours=runtime_hours,
-            cycle=cycle  # Pass cycle if available
+            pressure=request.pressure,
+            runtime_hours=request.runtime_hours,
+            cycle=request.cycle  # Pass cycle if available
         )
     except Exception as e:
         logger.error(f"Prediction failed: {e}", exc_info=True)
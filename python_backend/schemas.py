@@ -3,10 +3,11 @@ Pydantic Schemas
 Request and Response models for API validation
 """
 
-from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, validator, model_validator, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+import math
 
 
 # Helper to convert snake_case to camelCase
@@ -137,7 +138,7 @@ class MFARequiredResponse(BaseModel):
 class MFASetupResponse(BaseModel):
     """Response for MFA setup"""
     secret: str
-    qr_code: str  # Base64 encoded QR code image
+    qr_code: str  # QR code image as an SVG data URI
     backup_codes: List[str]
 
 
@@ -172,8 +173,26 @@ class MessageResponse(BaseModel):
 # ML Prediction Schemas
 # ====================
 
+# Sensor bounds used to clamp out-of-range readings before field validation
+_SENSOR_BOUNDS = {
+    "vibration": (0, 20),
+    "temperature": (-50, 200),
+    "current": (0, 50),
+    "pressure": (0, 300),
+    "runtime_hours": (0, 100000),
+    "cycle": (0, 1000),
+}
+
+
 class PredictionRequest(BaseModel):
-    """Sensor data for prediction"""
+    """
+    Sensor data for prediction.
+
+    This model is the single validation boundary: out-of-range readings are
+    clamped here (production resilience for noisy sensors), explicit nulls
+    get their defaults, and NaN/Infinity fail the field constraints - so
+    routes can hand the fields straight to the predictor.
+    """
     vibration: float = Field(..., ge=0, le=20, description="Vibration in mm/s (0-20)")
     temperature: float = Field(..., ge=-50, le=200, description="Temperature in °C (-50 to 200)")
     current: float = Field(..., ge=0, le=50, description="Current in A (0-50)")
@@ -182,6 +201,21 @@ class PredictionRequest(BaseModel):
     cycle: Optional[int] = Field(default=None, ge=0, le=1000, description="Current cycle number (0-1000)")
     machine_id: Optional[str] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def clamp_sensor_ranges(cls, data):
+        if isinstance(data, dict):
+            for name, (low, high) in _SENSOR_BOUNDS.items():
+                value = data.get(name)
+                if isinstance(value, (int, float)) and math.isfinite(value):
+                    data[name] = min(max(value, low), high)
+            # Explicit nulls fall back to the field defaults
+            if data.get("pressure") is None:
+                data["pressure"] = 100.0
+            if data.get("runtime_hours") is None:
+                data["runtime_hours"] = 0
+        return data
+
 
 class PredictionResponse(BaseModel):
     """ML prediction result"""
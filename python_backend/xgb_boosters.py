@@ -0,0 +1,62 @@
+"""
+Thin sklearn-like wrappers around raw xgboost Boosters.
+
+The xgboost training scripts fit via xgb.train over QuantileDMatrix so
+the classifier and regressor share one quantile sketch of the feature
+matrix (see notebooks/train_xgboost*.py). These wrappers give the
+resulting Boosters the predict/predict_proba surface health_predictor
+expects from the pickled models, honor the early-stopped round count at
+prediction time, and live in their own importable module because a class
+defined inside a script pickles under __main__ and could not be loaded
+by the backend.
+"""
+
+import numpy as np
+
+# Import guarded like the training scripts: the module stays importable
+# without xgboost, and the wrappers are only ever constructed (or
+# unpickled) where it is installed
+try:
+    import xgboost as xgb  # noqa: F401
+    _HAS_XGB = True
+except ImportError:
+    _HAS_XGB = False
+
+
+class _BoosterWrapper:
+    """Shared plumbing: hold the Booster and its early-stopped horizon"""
+
+    def __init__(self, booster):
+        self.booster = booster
+        # (0, 0) means all rounds; after early stopping only the rounds
+        # up to the best validation score are walked
+        best = getattr(booster, "best_iteration", None)
+        self.iteration_range = (0, best + 1) if best is not None else (0, 0)
+
+    @property
+    def best_iteration(self):
+        return getattr(self.booster, "best_iteration", None)
+
+    def _raw_predict(self, X):
+        # inplace_predict skips the DMatrix round-trip on the hot path
+        return self.booster.inplace_predict(
+            np.ascontiguousarray(X, dtype=np.float32),
+            iteration_range=self.iteration_range,
+        )
+
+
+class BoosterClassifier(_BoosterWrapper):
+    """multi:softprob Booster behaving like XGBClassifier at predict time"""
+
+    def predict_proba(self, X):
+        return self._raw_predict(X)
+
+    def predict(self, X):
+        return np.argmax(self._raw_predict(X), axis=1)
+
+
+class BoosterRegressor(_BoosterWrapper):
+    """Squared-error Booster behaving like XGBRegressor at predict time"""
+
+    def predict(self, X):
+        return self._raw_predict(X)